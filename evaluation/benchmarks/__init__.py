@@ -0,0 +1 @@
+"""Benchmarks of the evaluation pipeline against deterministic fake models."""
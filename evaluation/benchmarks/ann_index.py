@@ -0,0 +1,92 @@
+"""Build the approximate nearest neighbour indexes of the LanceDB embedding stores of a graph.
+
+Index parameters are picked from the table size, small tables being left to exact search.
+Each index is then checked against an exact search: recall@k of sample queries and p50 latencies.
+
+The stores are copied to a temporary folder, or to `--copy-to`, and indexed there: indexing the
+graph itself changes its content hash and modification times, so the search, judge and response
+caches built on it would no longer match. `--in-place` indexes the graph itself, which is refused
+for graphs tracked in this repository such as the sample indexes.
+
+Usage (from the evaluation folder):
+    python -m benchmarks.ann_index sample-gpt4/output --force
+"""
+import argparse
+import json
+import math
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import lancedb
+
+from graph_sdk import AnnSearch
+from graph_sdk.ann_index import IndexParams, build_index, check_recall, dimensions, index_params
+from graph_sdk.graph_artifacts import ENTITY_DESCRIPTION_INDEX, FULL_CONTENT_INDEX
+
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[2]
+
+
+def main(args: argparse.Namespace) -> None:
+    stores = Path(args.graph_path) / "lancedb"
+    if args.in_place:
+        if stores.resolve().is_relative_to(REPOSITORY_ROOT):
+            raise SystemExit(f"Refusing to index {args.graph_path} in place, it is part of the repository. "
+                             "Use --copy-to to index a copy of it instead.")
+        index_stores(stores, args)
+    elif args.copy_to:
+        copy = Path(args.copy_to) / "lancedb"
+        shutil.copytree(stores, copy)
+        index_stores(copy, args)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            copy = Path(tmp) / "lancedb"
+            shutil.copytree(stores, copy)
+            index_stores(copy, args)
+
+
+def index_stores(stores: Path, args: argparse.Namespace) -> None:
+    db = lancedb.connect(str(stores))
+    search = AnnSearch(nprobes=args.nprobes, refine_factor=args.refine_factor)
+    report = {}
+    for name in [ENTITY_DESCRIPTION_INDEX, FULL_CONTENT_INDEX]:
+        table = db.open_table(name)
+        rows = table.count_rows()
+        params = index_params(rows, dimensions(table))
+        if params is None and args.force:
+            # Small tables get a few partitions only, enough to try the index out
+            params = IndexParams("IVF_PQ", num_partitions=max(1, round(math.sqrt(rows) / 4)),
+                                 num_sub_vectors=dimensions(table) // 16)
+        entry: dict[str, Any] = {"rows": rows, "index_type": params.index_type if params else "exact search"}
+        if params is not None:
+            entry["num_partitions"] = params.num_partitions
+            entry["build_s"] = build_index(table, params)
+        entry.update(check_recall(table, search, k=args.k, samples=args.samples))
+        report[name] = entry
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+
+
+def __parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("graph_path", help="Indexer output folder, holding the lancedb folder")
+    parser.add_argument("--force", action="store_true", help="Build indexes on tables small enough for exact search")
+    location = parser.add_mutually_exclusive_group()
+    location.add_argument("--copy-to", help="Index a copy of the stores in this folder, kept after the run")
+    location.add_argument("--in-place", action="store_true",
+                          help="Index the stores of the graph itself, refused for graphs of this repository")
+    parser.add_argument("--nprobes", type=int, default=AnnSearch.nprobes, help="IVF partitions scanned per query")
+    parser.add_argument("--refine-factor", type=int, help="Re-rank this many times k candidates exactly")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared for the recall")
+    parser.add_argument("--samples", type=int, default=100, help="Sample queries of the recall check")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(__parse_args())
@@ -0,0 +1,149 @@
+"""Deterministic stand-ins for the chat and embedding models, registered in graphrag's ModelFactory."""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Any, AsyncGenerator, ClassVar, Generator
+
+import numpy as np
+from graphrag.config.models.language_model_config import LanguageModelConfig
+from graphrag.language_model.factory import ModelFactory
+from graphrag.language_model.response.base import (
+    BaseModelOutput,
+    BaseModelResponse,
+)
+
+FAKE_CHAT = "benchmark_chat"
+FAKE_EMBEDDING = "benchmark_embedding"
+
+
+@dataclass
+class FakeModelProfile:
+    """Behavior of the fake models, shared by every instance."""
+
+    latency: float = 0.5
+    """Mean latency of a call, in seconds"""
+    jitter: float = 0.1
+    """Latency standard deviation, in seconds"""
+    output_tokens: int = 200
+    """Number of words of a chat response"""
+    error_rate: float = 0.0
+    """Probability of a call failing with a rate-limit error"""
+    dimensions: int = 3072
+    """Size of the embedding vectors, must match the graph LanceDB tables"""
+    seed: int = 0
+
+
+class FakeRateLimitError(Exception):
+    """Simulated 429 error of a model deployment."""
+
+    status_code = 429
+
+
+class _FakeModel:
+    profile: ClassVar[FakeModelProfile] = FakeModelProfile()
+
+    def __init__(self, name: str = "", config: LanguageModelConfig | None = None, **kwargs: Any) -> None:
+        self.name = name
+        self.config = config
+        self._random = random.Random(self.profile.seed)
+        self.calls = 0
+
+    def _latency(self) -> float:
+        """Draw the latency of a call, failing it at the configured error rate."""
+        self.calls += 1
+        if self._random.random() < self.profile.error_rate:
+            raise FakeRateLimitError(f"{self.name}: simulated rate limit")
+        return max(0.0, self._random.gauss(self.profile.latency, self.profile.jitter))
+
+
+class FakeChatModel(_FakeModel):
+    """Chat model answering after a simulated latency with text derived from the prompt.
+
+    JSON calls get an object carrying the fields expected by the global search map step
+    and the DRIFT primer and actions, so every search strategy runs to completion.
+    """
+
+    async def achat(self, prompt: str, history: list | None = None, **kwargs: Any) -> BaseModelResponse:
+        await asyncio.sleep(self._latency())
+        return self._response(prompt, **kwargs)
+
+    async def achat_stream(self, prompt: str, history: list | None = None, **kwargs: Any) -> AsyncGenerator[str, None]:
+        await asyncio.sleep(self._latency())
+        for word in self._content(prompt, **kwargs).split(" "):
+            yield word + " "
+
+    def chat(self, prompt: str, history: list | None = None, **kwargs: Any) -> BaseModelResponse:
+        time.sleep(self._latency())
+        return self._response(prompt, **kwargs)
+
+    def chat_stream(self, prompt: str, history: list | None = None, **kwargs: Any) -> Generator[str, None, None]:
+        time.sleep(self._latency())
+        for word in self._content(prompt, **kwargs).split(" "):
+            yield word + " "
+
+    def _response(self, prompt: str, **kwargs: Any) -> BaseModelResponse:
+        return BaseModelResponse(output=BaseModelOutput(content=self._content(prompt, **kwargs)))
+
+    def _content(self, prompt: str, json: bool = False, model_parameters: dict | None = None, **kwargs: Any) -> str:
+        digest = sha256(prompt.encode()).hexdigest()
+        text = " ".join(digest[i % len(digest):][:8] for i in range(self.profile.output_tokens))
+        if json or "response_format" in (model_parameters or {}):
+            return _json_response(text, digest)
+        return text
+
+
+class FakeEmbeddingModel(_FakeModel):
+    """Embedding model returning unit vectors seeded by the text."""
+
+    async def aembed_batch(self, text_list: list[str], **kwargs: Any) -> list[list[float]]:
+        await asyncio.sleep(self._latency())
+        return [self._vector(text) for text in text_list]
+
+    async def aembed(self, text: str, **kwargs: Any) -> list[float]:
+        return (await self.aembed_batch([text]))[0]
+
+    def embed_batch(self, text_list: list[str], **kwargs: Any) -> list[list[float]]:
+        time.sleep(self._latency())
+        return [self._vector(text) for text in text_list]
+
+    def embed(self, text: str, **kwargs: Any) -> list[float]:
+        return self.embed_batch([text])[0]
+
+    def _vector(self, text: str) -> list[float]:
+        seed = int.from_bytes(sha256(text.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.profile.dimensions)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+def register_fake_models(profile: FakeModelProfile) -> None:
+    """Register the fake models in graphrag's ModelFactory, configured with the given profile."""
+    _FakeModel.profile = profile
+    ModelFactory.register_chat(FAKE_CHAT, lambda **kwargs: FakeChatModel(**kwargs))
+    ModelFactory.register_embedding(FAKE_EMBEDDING, lambda **kwargs: FakeEmbeddingModel(**kwargs))
+
+
+def fake_model_configs(deployment_name: str, model: str = "gpt-4.1-mini") -> tuple[LanguageModelConfig, LanguageModelConfig]:
+    """Chat and embedding configurations creating fake models through the ModelManager.
+
+    The model name only selects the tokenizer used to count tokens, as for the real deployments.
+    """
+    chat_config = LanguageModelConfig(
+        type=FAKE_CHAT, model=model, deployment_name=deployment_name, api_key="benchmark")
+    embedding_config = LanguageModelConfig(
+        type=FAKE_EMBEDDING, model="text-embedding-3-large", deployment_name=f"{deployment_name}-embedding",
+        api_key="benchmark")
+    return chat_config, embedding_config
+
+
+def _json_response(text: str, digest: str) -> str:
+    score = int(digest[:2], 16) % 100
+    return json.dumps({
+        "points": [{"description": text, "score": score}],
+        "intermediate_answer": text,
+        "response": text,
+        "score": score,
+        "follow_up_queries": [f"Follow-up {digest[:8]}?"],
+    })
@@ -0,0 +1,200 @@
+"""Benchmark the graph loading, context building, search and evaluation stages without Azure OpenAI.
+
+Chat and embedding calls go to deterministic fake models with a configurable latency, response
+size and error rate, so runs are comparable before and after a performance change.
+
+Usage (from the evaluation folder):
+    python -m benchmarks.run --queries 20 --latency 0.5 --output assets/benchmark.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from rich.table import Table
+
+from app_config import settings
+from config import load_queries
+from evaluator_workflow import evaluate_locally
+from graph_sdk import GraphArtifacts, GraphContext, GraphExplorer, SearchType
+from graph_sdk.search_builder import Drift, Global, Local
+from utils import console
+
+from .fake_models import FakeModelProfile, fake_model_configs, register_fake_models
+
+GRAPH_TABLES = [
+    "entities", "relationships", "community_reports", "communities", "text_units",
+    "full_content_reports", "community_report_store", "text_unit_store",
+]
+
+
+class FakeJudge:
+    """Evaluator scoring responses from their length after a simulated judge latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def __call__(self, *, query: str, response: str, context: str) -> dict:
+        time.sleep(self.latency)
+        return {"score": len(response) % 5 + 1}
+
+
+def bench_graph_load(graph_path: Path) -> dict[str, float]:
+    """Time loading every graph table, converted from the parquet files then read from the snapshot."""
+    timings = {}
+    for name, use_snapshot in [("parquet", False), ("snapshot", True)]:
+        start = time.perf_counter()
+        artifacts = GraphArtifacts(graph_path, use_snapshot=use_snapshot)
+        for table in GRAPH_TABLES:
+            getattr(artifacts, table)
+        timings[f"load_{name}_s"] = time.perf_counter() - start
+    return timings
+
+
+async def bench_context_build(ctx: GraphContext, queries: list[str]) -> dict[str, float]:
+    """Time building the search context of each strategy, without any chat call."""
+    local_builder = Local.context_builder(ctx)
+    global_builder = Global.build(ctx).context_builder
+    drift_builder = Drift.build(ctx).context_builder
+
+    async def build_local(query: str) -> Any:
+        return local_builder.build_context(query, **Local.CONTEXT_PARAMS)
+
+    async def build_global(query: str) -> Any:
+        return await global_builder.build_context(query, **Global.CONTEXT_PARAMS)
+
+    async def build_drift(query: str) -> Any:
+        return await drift_builder.build_context(query)
+
+    timings = {}
+    for type, build in [(SearchType.LOCAL, build_local), (SearchType.GLOBAL, build_global),
+                        (SearchType.DRIFT, build_drift)]:
+        latencies = await __timed_sequentially(build, queries)
+        timings[f"context_{type.value}_mean_s"] = statistics.mean(latencies)
+    return timings
+
+
+async def bench_search(explorer: GraphExplorer, queries: list[str], type: SearchType,
+                       concurrency: int) -> tuple[dict[str, float], list[dict]]:
+    """Run every query through GraphExplorer.search and measure throughput and latency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    rows: list[dict] = []
+    errors = 0
+
+    async def search(query: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await explorer.search(query, type, use_cache=False)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            rows.append({"query": query, "response": str(result.response), "context_text": str(result.context_text)})
+
+    start = time.perf_counter()
+    await asyncio.gather(*map(search, queries))
+    elapsed = time.perf_counter() - start
+
+    prefix = f"search_{type.value}"
+    timings = {f"{prefix}_qps": len(latencies) / elapsed, f"{prefix}_errors": errors}
+    if latencies:
+        timings[f"{prefix}_p50_s"] = __percentile(latencies, 50)
+        timings[f"{prefix}_p95_s"] = __percentile(latencies, 95)
+    return timings, rows
+
+
+def bench_evaluation(rows: list[dict], judge_latency: float, shard_size: int) -> dict[str, float]:
+    """Time the local evaluation of search results with fake judges."""
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = Path(tmp) / "benchmark_dataset.jsonl"
+        dataset.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+        start = time.perf_counter()
+        evaluate_locally(
+            dataset, None, shard_size=shard_size,  # type: ignore[arg-type]
+            evaluators={"groundedness": FakeJudge(judge_latency), "qa": FakeJudge(judge_latency)})
+        return {"evaluation_s": time.perf_counter() - start}
+
+
+async def main(args: argparse.Namespace) -> None:
+    register_fake_models(FakeModelProfile(
+        latency=args.latency, jitter=args.jitter, output_tokens=args.output_tokens,
+        error_rate=args.error_rate, seed=args.seed))
+
+    entries = load_queries()
+    queries = [entries[i % len(entries)].query for i in range(args.queries)]
+    results: dict[str, dict[str, float]] = {}
+
+    for variant in args.variants or settings.evaluations.keys():
+        graph_path = Path(settings.evaluations[variant].path)
+        chat_config, embedding_config = fake_model_configs(f"benchmark-{variant}")
+        console.print(f"[bold cyan]⏱️  Benchmarking {graph_path}[/bold cyan]")
+
+        timings = bench_graph_load(graph_path)
+        explorer = GraphExplorer(graph_path, chat_config, embedding_config)
+        ctx = GraphContext(graph_path, chat_config, embedding_config)
+        timings.update(await bench_context_build(ctx, queries))
+
+        for type in SearchType:
+            search_timings, rows = await bench_search(explorer, queries, type, args.concurrency)
+            timings.update(search_timings)
+            if type == SearchType.LOCAL:
+                timings.update(bench_evaluation(rows, args.judge_latency, args.shard_size))
+        results[variant] = timings
+
+    __print_results(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        console.print(f"[green]Benchmark results written to {args.output}[/green]")
+
+
+async def __timed_sequentially(call: Callable[[str], Awaitable[Any]], queries: list[str]) -> list[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await call(query)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def __percentile(values: list[float], percentile: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
+
+
+def __print_results(results: dict[str, dict[str, float]]) -> None:
+    table = Table(title="Benchmark results")
+    table.add_column("Metric", style="cyan")
+    for variant in results:
+        table.add_column(variant, justify="right")
+    metrics = dict.fromkeys(name for timings in results.values() for name in timings)
+    for metric in metrics:
+        table.add_row(metric, *(f"{timings.get(metric, float('nan')):.4f}" for timings in results.values()))
+    console.print(table)
+
+
+def __parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20, help="Number of queries per search strategy")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent searches")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean fake model latency, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Fake model latency deviation, in seconds")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Words per fake chat response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a fake rate-limit error")
+    parser.add_argument("--judge-latency", type=float, default=0.05, help="Fake judge latency, in seconds")
+    parser.add_argument("--shard-size", type=int, default=20, help="Rows per evaluation shard")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the fake models")
+    parser.add_argument("--variants", nargs="*", help="Evaluations of settings.toml to benchmark, all by default")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(__parse_args()))
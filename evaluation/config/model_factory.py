@@ -6,6 +6,7 @@ from graphrag.config.models.language_model_config import LanguageModelConfig
 
 from adapters.aoai_configs_adapter import aoai_configs_adapter
 from app_config import settings
+from utils.performance import ModelPricing
 
 
 class ModelFactory:
@@ -14,11 +15,13 @@ class ModelFactory:
     MAX_RETRIES: Final[int] = 20
     chat_models: dict[str, LanguageModelConfig]
     embedding_models: dict[str, LanguageModelConfig]
+    pricing: dict[str, ModelPricing]
 
     def __init__(self):
         self.chat_models = self._build_models(ModelType.AzureOpenAIChat)
         self.embedding_models = self._build_models(
             ModelType.AzureOpenAIEmbedding)
+        self.pricing = self._build_pricing()
 
     def get(self, name: str, type: ModelType = ModelType.AzureOpenAIChat) -> LanguageModelConfig | None:
         """Get a language model configuration by name and type."""
@@ -30,6 +33,10 @@ class ModelFactory:
         model = self.get(name, type)
         return aoai_configs_adapter.to_azure_openai_model_config(model) if model else None
 
+    def get_pricing(self, deployment_name: str) -> ModelPricing | None:
+        """Get the token pricing of a chat deployment, None if it is not configured."""
+        return self.pricing.get(deployment_name)
+
     def list_models(self, type: ModelType) -> list[str]:
         """List all available model names for a given type."""
         models = self._get_model_dict(type)
@@ -59,5 +66,18 @@ class ModelFactory:
                 max_retries=self.MAX_RETRIES,
                 model_supports_json=getattr(
                     model_config, 'model_supports_json', None),
+                tokens_per_minute=getattr(
+                    model_config, 'tokens_per_minute', None),
             )
         return models
+
+    def _build_pricing(self) -> dict[str, ModelPricing]:
+        """Build the token pricing of the chat deployments from settings."""
+        pricing = {}
+        for model_config in settings.models[ModelType.AzureOpenAIChat].values():
+            input_cost = getattr(model_config, 'input_token_cost', None)
+            output_cost = getattr(model_config, 'output_token_cost', None)
+            if input_cost is not None and output_cost is not None:
+                pricing[model_config.deployment_name] = ModelPricing(
+                    input=input_cost, output=output_cost)
+        return pricing
@@ -1,7 +1,12 @@
 
+import json
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
 from re import search
+from threading import BoundedSemaphore
 from typing import Callable, Dict, Optional
 
 from azure.ai.evaluation import (
@@ -22,20 +27,56 @@ from azure.ai.projects.models import (
 )
 from azure.identity import DefaultAzureCredential
 
+from utils.concurrency import LimitedEvaluator
+from utils.judge_cache import CachedEvaluator, JudgeCache
+from utils.performance import ModelPricing, performance_metrics
 
-def evaluate_locally(dataset: Path, evaluation_model: AzureOpenAIModelConfiguration, target: Optional[Callable] = None) -> EvaluationResult:
+# Number of dataset rows evaluated by a single evaluation run
+EVALUATION_SHARD_SIZE = 20
+# Number of evaluation runs in flight at once
+EVALUATION_CONCURRENT_SHARDS = 4
+# Number of evaluator calls in flight at once across every evaluation run, bounding the load on the judge model
+EVALUATION_CONCURRENT_JUDGE_CALLS = 8
+
+
+def evaluate_locally(dataset: Path, evaluation_model: AzureOpenAIModelConfiguration, target: Optional[Callable] = None,
+                     shard_size: int = EVALUATION_SHARD_SIZE,
+                     max_concurrent_shards: int = EVALUATION_CONCURRENT_SHARDS,
+                     max_concurrent_judge_calls: int = EVALUATION_CONCURRENT_JUDGE_CALLS,
+                     judge_cache: Optional[JudgeCache] = None,
+                     evaluators: Optional[Dict[str, Callable]] = None,
+                     pricing: Optional[ModelPricing] = None) -> EvaluationResult:
     """
     Run evaluators locally on the provided dataset using the specified evaluation model.
     If a target function is provided, it will be used to generate model responses for evaluation.
     Otherwise, it is assumed that the dataset already contains model responses.
 
+    The dataset is split into shards of `shard_size` rows, evaluated concurrently by at most
+    `max_concurrent_shards` evaluation runs. Each run calls the evaluators from its own worker threads,
+    so the evaluators of every run share a limit of `max_concurrent_judge_calls` calls in flight,
+    which bounds the load on the judge model. Composite evaluators, such as the QA one, make a few
+    judge calls per evaluator call.
+    Each shard result is written to a folder of the run next to the dataset as soon as it completes,
+    so a failing run still leaves the results of the finished shards behind, and later runs keep them.
+
     Parameters:
     - dataset (Path): Path to the dataset file containing queries and context.
     - evaluation_model (AzureOpenAIModelConfiguration): Configuration for the evaluation model.
     - target (Optional[Callable]): A callable that generates model responses for evaluation.
+    - shard_size (int): Number of dataset rows evaluated by a single evaluation run.
+    - max_concurrent_shards (int): Number of evaluation runs in flight at once.
+    - max_concurrent_judge_calls (int): Number of evaluator calls in flight at once across every run.
+    - judge_cache (Optional[JudgeCache]): Store of previous evaluator results. When provided,
+      only rows whose mapped inputs were never scored by the same evaluator and judge call the judge model.
+    - evaluators (Optional[Dict[str, Callable]]): Evaluators to run instead of the groundedness and QA ones.
+    - pricing (Optional[ModelPricing]): Price of the chat deployment that generated the responses,
+      used to estimate the cost of the searches.
 
     Returns:
-    - EvaluationResult: The result of the evaluation containing scores from the evaluators.
+    - EvaluationResult: The result of the evaluation containing scores from the evaluators,
+      with the rows of every shard and their metrics aggregated over the whole dataset.
+      When the dataset carries search metrics, the latency percentiles, LLM usage and cost
+      per query are reported along the scores as `performance.*` metrics.
     """
 
     # Use the target results as response for evaluation
@@ -64,15 +105,83 @@ def evaluate_locally(dataset: Path, evaluation_model: AzureOpenAIModelConfigurat
             }
         }
 
-    return evaluate(
-        data=dataset,
-        target=target,
-        evaluators={
+    if evaluators is None:
+        evaluators = {
             "groundedness": GroundednessEvaluator(evaluation_model),
             "qa": QAEvaluator(evaluation_model)
-        },
-        evaluator_config=config
-    )
+        }
+    inputs = config["default"]["column_mapping"]
+    judge_calls = BoundedSemaphore(max_concurrent_judge_calls)
+    evaluators = {name: LimitedEvaluator(evaluator, judge_calls, inputs) for name, evaluator in evaluators.items()}
+    if judge_cache is not None:
+        # Cached results are read without waiting for a judge call slot
+        evaluators = {
+            name: CachedEvaluator(evaluator, judge_cache, evaluation_model["azure_deployment"],
+                                  inputs=inputs, name=name)
+            for name, evaluator in evaluators.items()
+        }
+
+    output_dir = dataset.with_name(f"{dataset.stem}_evaluation") / datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    shards = __split_dataset(dataset, output_dir, shard_size)
+    results: list[EvaluationResult] = [None] * len(shards)  # type: ignore[list-item]
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_shards) as executor:
+        futures = {
+            executor.submit(
+                evaluate,
+                data=shard,
+                target=target,
+                evaluators=evaluators,
+                evaluator_config=config,
+                output_path=shard.with_suffix(".result.json")
+            ): i
+            for i, shard in enumerate(shards)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            logging.info("Evaluated %s", shards[futures[future]])
+
+    evaluation_result = __merge_results(results)
+    evaluation_result["metrics"].update(performance_metrics(dataset, pricing))
+    with open(output_dir / "evaluation_results.json", "w", encoding="utf-8") as f:
+        json.dump(evaluation_result, f, ensure_ascii=False, default=str)
+    return evaluation_result
+
+
+def __split_dataset(dataset: Path, output_dir: Path, shard_size: int) -> list[Path]:
+    """
+    Split a JSONL dataset into shard files of at most `shard_size` rows, in the new folder of the run.
+    """
+    output_dir.mkdir(parents=True)
+
+    with open(dataset, "r", encoding="utf-8") as f:
+        rows = [line for line in f if line.strip()]
+
+    shards = []
+    for i in range(0, len(rows), shard_size):
+        shard = output_dir / f"shard-{i // shard_size:04d}.jsonl"
+        shard.write_text("".join(rows[i:i + shard_size]), encoding="utf-8")
+        shards.append(shard)
+    return shards
+
+
+def __merge_results(results: list[EvaluationResult]) -> EvaluationResult:
+    """
+    Concatenate the rows of shard evaluations and aggregate their metrics.
+    Each metric is the mean of the shard metrics weighted by their number of rows.
+    """
+    rows = [row for result in results for row in result["rows"]]
+
+    totals: Dict[str, float] = {}
+    weights: Dict[str, int] = {}
+    for result in results:
+        for name, value in result["metrics"].items():
+            if isinstance(value, (int, float)) and not math.isnan(value):
+                totals[name] = totals.get(name, 0.0) + value * len(result["rows"])
+                weights[name] = weights.get(name, 0) + len(result["rows"])
+
+    metrics = {name: totals[name] / weights[name] for name in totals if weights[name]}
+    return EvaluationResult(rows=rows, metrics=metrics)  # type: ignore[typeddict-item]
 
 
 def evaluate_cloud(dataset: Path, project_endpoint: str, judge_deployment_name: str) -> None:
@@ -0,0 +1,151 @@
+"""Approximate nearest neighbour indexes of the LanceDB embedding stores of a graph, see benchmarks.ann_index."""
+import json
+import math
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from graphrag.vector_stores.base import VectorStoreDocument, VectorStoreSearchResult
+from graphrag.vector_stores.lancedb import LanceDBVectorStore
+from lancedb.index import HnswSq, IvfPq
+
+# Exact scans of smaller tables take a few milliseconds, an index would only cost recall
+EXACT_SEARCH_MAX_ROWS = 50_000
+# Above this size, HNSW graphs no longer fit comfortably in memory, product quantization does
+HNSW_MAX_ROWS = 1_000_000
+
+
+@dataclass(frozen=True)
+class AnnSearch:
+    """Runtime options of the similarity searches on the LanceDB embedding stores."""
+
+    nprobes: int = 20
+    """IVF partitions scanned per query, trading latency for recall"""
+    refine_factor: int | None = None
+    """Re-rank `refine_factor * k` candidates with their exact vectors, recovering the recall lost to quantization"""
+    build_missing: bool = False
+    """Build an index on large tables missing one when the graph is loaded"""
+
+
+@dataclass(frozen=True)
+class IndexParams:
+    """Vector index of an embedding table."""
+
+    index_type: str
+    """IVF_PQ or IVF_HNSW_SQ"""
+    num_partitions: int
+    num_sub_vectors: int | None = None
+    """Product quantization sub-vectors, IVF_PQ only"""
+
+    def config(self) -> IvfPq | HnswSq:
+        # The stores query with the default L2 metric, equivalent to cosine on normalized embeddings
+        if self.index_type == "IVF_PQ":
+            return IvfPq(distance_type="l2", num_partitions=self.num_partitions, num_sub_vectors=self.num_sub_vectors)
+        return HnswSq(distance_type="l2", num_partitions=self.num_partitions)
+
+
+def index_params(num_rows: int, dimensions: int) -> IndexParams | None:
+    """Pick the index of a table from its size, None when exact search is fast enough.
+
+    IVF partitions hold about sqrt(rows) vectors each. Up to HNSW_MAX_ROWS, partitions are searched
+    through HNSW graphs over scalar-quantized vectors (best recall), product quantization with
+    16 dimensions per sub-vector above.
+    """
+    if num_rows < EXACT_SEARCH_MAX_ROWS:
+        return None
+    if num_rows <= HNSW_MAX_ROWS:
+        return IndexParams("IVF_HNSW_SQ", num_partitions=max(1, num_rows // 100_000))
+    sub_vector_size = 16 if dimensions % 16 == 0 else 8
+    return IndexParams("IVF_PQ", num_partitions=min(8192, round(math.sqrt(num_rows))),
+                       num_sub_vectors=dimensions // sub_vector_size)
+
+
+def build_index(table: Any, params: IndexParams) -> float:
+    """Replace the vector index of a table, returning the build duration in seconds."""
+    start = time.perf_counter()
+    table.create_index("vector", replace=True, config=params.config())
+    return time.perf_counter() - start
+
+
+def ensure_index(table: Any) -> IndexParams | None:
+    """Build the index of a large table missing one, returning its parameters if it was built."""
+    if table.list_indices():
+        return None
+    params = index_params(table.count_rows(), dimensions(table))
+    if params is not None:
+        build_index(table, params)
+    return params
+
+
+def check_recall(table: Any, search: AnnSearch, k: int = 10, samples: int = 100, seed: int = 0) -> dict[str, float]:
+    """Compare the approximate and exact top-k of sample queries, close to but not in the table.
+
+    Returns:
+        Mean recall@k of the approximate search and the p50 latencies of both searches, in seconds
+    """
+    vectors = np.stack(table.to_pandas()["vector"].to_numpy()).astype(np.float32)
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), size=min(samples, len(vectors)), replace=False)]
+    queries = queries + rng.normal(scale=0.01, size=queries.shape).astype(np.float32)
+
+    recalls, ann_latencies, exact_latencies = [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        approximate = _ann_query(table, query, search).limit(k).to_list()
+        ann_latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        exact = table.search(query).bypass_vector_index().limit(k).to_list()
+        exact_latencies.append(time.perf_counter() - start)
+        recalls.append(len({doc["id"] for doc in approximate} & {doc["id"] for doc in exact}) / max(1, len(exact)))
+
+    return {
+        f"recall@{k}": statistics.mean(recalls),
+        "ann_p50_s": statistics.median(ann_latencies),
+        "exact_p50_s": statistics.median(exact_latencies),
+    }
+
+
+class AnnLanceDBVectorStore(LanceDBVectorStore):
+    """LanceDB store applying the runtime options of the approximate searches."""
+
+    def __init__(self, search: AnnSearch, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.search = search
+
+    def connect(self, **kwargs: Any) -> Any:
+        super().connect(**kwargs)
+        if self.search.build_missing and getattr(self, "document_collection", None) is not None:
+            ensure_index(self.document_collection)
+
+    def similarity_search_by_vector(
+        self, query_embedding: list[float] | np.ndarray, k: int = 10, **kwargs: Any
+    ) -> list[VectorStoreSearchResult]:
+        query = _ann_query(self.document_collection, np.asarray(query_embedding, dtype=np.float32), self.search)
+        if self.query_filter:
+            query = query.where(self.query_filter, prefilter=True)
+        return [
+            VectorStoreSearchResult(
+                document=VectorStoreDocument(
+                    id=doc[self.id_field],
+                    text=doc[self.text_field],
+                    vector=doc[self.vector_field],
+                    attributes=json.loads(doc[self.attributes_field]),
+                ),
+                score=1 - abs(float(doc["_distance"])),
+            )
+            for doc in query.limit(k).to_list()
+        ]
+
+
+def _ann_query(table: Any, vector: np.ndarray, search: AnnSearch) -> Any:
+    query = table.search(vector, vector_column_name="vector").nprobes(search.nprobes)
+    if search.refine_factor:
+        query = query.refine_factor(search.refine_factor)
+    return query
+
+
+def dimensions(table: Any) -> int:
+    """Size of the vectors of an embedding table."""
+    return table.schema.field("vector").type.list_size
@@ -0,0 +1,236 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncGenerator
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter adapting the number of in-flight calls to what a deployment sustains.
+
+    Used as an async context manager, like an asyncio.Semaphore. Latencies are judged over
+    windows of as many calls as the limit: the limit grows by one after a window whose median
+    latency stays within `latency_tolerance` times the baseline, and shrinks by `backoff` after
+    one past it. The baseline is the median latency of the last `baseline_windows` windows: it
+    rises again once a deployment gets slower for good instead of holding on to its fastest call,
+    and a few slow calls never back off. The limit is halved on a rate-limit (429) error. When a tokens-per-minute
+    budget is set, new calls wait while the tokens reported through `record_tokens` over the
+    last minute exceed it.
+
+    graphrag's models retry rate-limited calls internally, so 429 errors rarely reach the
+    limiter: `observe_llm_events` reports them, with the tokens of each call, as they happen.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 3,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        tokens_per_minute: int | None = None,
+        latency_tolerance: float | None = 2.0,
+        backoff: float = 0.75,
+        baseline_windows: int = 10,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            initial_limit: Number of concurrent calls allowed at start
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            tokens_per_minute: Token budget of the deployment, None for no budget
+            latency_tolerance: Ratio of the median latency of a window to the baseline considered
+                as overload, None to only back off on rate-limit errors
+            backoff: Factor applied to the limit when latency degrades
+            baseline_windows: Number of recent windows whose median latency is the baseline
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tokens_per_minute = tokens_per_minute
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._window: list[float] = []
+        self._medians: deque[float] = deque(maxlen=baseline_windows)
+        self._tokens: deque[tuple[float, int]] = deque()
+        self._condition = asyncio.Condition()
+        self._started: dict[asyncio.Task | None, list[float]] = {}
+
+    @property
+    def limit(self) -> int:
+        """Current number of concurrent calls allowed."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        return self._in_flight
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        async with self._condition:
+            while True:
+                if self._in_flight < self.limit:
+                    wait = self._token_budget_wait()
+                    if wait <= 0:
+                        break
+                else:
+                    wait = None
+                try:
+                    await asyncio.wait_for(self._condition.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+            self._in_flight += 1
+        self._started.setdefault(asyncio.current_task(), []).append(time.monotonic())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        started = self._started[asyncio.current_task()]
+        latency = time.monotonic() - started.pop()
+        if not started:
+            del self._started[asyncio.current_task()]
+
+        async with self._condition:
+            self._in_flight -= 1
+            if exc is not None and _is_rate_limited(exc):
+                self._decrease(0.5)
+            elif exc is None:
+                self._record_latency(latency)
+            self._condition.notify_all()
+
+    def record_throttled(self) -> None:
+        """Report a rate-limited call, retried by the model client rather than raised."""
+        self._decrease(0.5)
+
+    def record_tokens(self, tokens: int) -> None:
+        """Report the tokens consumed by a completed call against the per-minute budget."""
+        if self.tokens_per_minute:
+            self._tokens.append((time.monotonic(), tokens))
+
+    def _record_latency(self, latency: float) -> None:
+        self._window.append(latency)
+        if len(self._window) < self.limit:
+            return
+        median = statistics.median(self._window)
+        self._window = []
+
+        overloaded = (len(self._medians) > 0 and self.latency_tolerance is not None
+                      and median > statistics.median(self._medians) * self.latency_tolerance)
+        self._medians.append(median)
+        if overloaded:
+            self._decrease(self.backoff)
+        else:
+            # Additive increase once a full window of calls succeeded at the current limit
+            self._limit = min(self._limit + 1, self.max_limit)
+
+    def _decrease(self, factor: float) -> None:
+        self._window = []
+        self._limit = max(self._limit * factor, self.min_limit)
+
+    def _token_budget_wait(self) -> float:
+        """Seconds to wait before the token budget allows a new call, 0 if it already does."""
+        if not self.tokens_per_minute:
+            return 0
+        now = time.monotonic()
+        while self._tokens and now - self._tokens[0][0] >= 60:
+            self._tokens.popleft()
+        if sum(tokens for _, tokens in self._tokens) < self.tokens_per_minute:
+            return 0
+        return 60 - (now - self._tokens[0][0])
+
+
+_limiters: dict[tuple[str, str], AdaptiveLimiter] = {}
+
+
+def limiter_for(deployment_name: str, scope: str = "search", **kwargs: Any) -> AdaptiveLimiter:
+    """Get the adaptive limiter shared by every caller of a deployment.
+
+    Searches and the LLM calls they make get limiters of different scopes: a search holding
+    a slot of a limiter must not wait for another slot of the same limiter for its own calls.
+
+    Args:
+        deployment_name: Name of the model deployment
+        scope: What the limiter bounds, e.g. "search" or "llm"
+        **kwargs: AdaptiveLimiter parameters, used when the limiter is first created
+    """
+    key = (deployment_name, scope)
+    if key not in _limiters:
+        _limiters[key] = AdaptiveLimiter(**kwargs)
+    return _limiters[key]
+
+
+def observe_llm_events(chat_model: Any, deployment_name: str) -> bool:
+    """Report the rate-limited retries and the token usage of a chat model to the limiters of its deployment.
+
+    Hooks the events of graphrag's fnllm models, shared by their retry and rate limiting
+    services. Limiters created later for the deployment are reported to as well.
+
+    Returns:
+        Whether the model exposes its events, other providers are left unobserved
+    """
+    events = _fnllm_events(chat_model)
+    if events is None:
+        return False
+    if getattr(events, "_observed_deployment", None) is not None:
+        return True
+    events._observed_deployment = deployment_name
+    on_retryable_error, on_usage = events.on_retryable_error, events.on_usage
+
+    async def on_retryable_error_observed(error: BaseException, attempt_number: int) -> None:
+        if _is_rate_limited(error):
+            for limiter in _deployment_limiters(deployment_name):
+                limiter.record_throttled()
+        await on_retryable_error(error, attempt_number)
+
+    async def on_usage_observed(usage: Any) -> None:
+        for limiter in _deployment_limiters(deployment_name):
+            limiter.record_tokens(usage.total_tokens)
+        await on_usage(usage)
+
+    events.on_retryable_error = on_retryable_error_observed
+    events.on_usage = on_usage_observed
+    return True
+
+
+class LimitedChatModel:
+    """Chat model running each call of the wrapped model under a limiter, streamed calls included."""
+
+    def __init__(self, model: Any, limiter: AbstractAsyncContextManager) -> None:
+        self.model = model
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    async def achat(self, prompt: str, history: list | None = None, **kwargs: Any) -> Any:
+        async with self.limiter:
+            return await self.model.achat(prompt, history, **kwargs)
+
+    async def achat_stream(self, prompt: str, history: list | None = None, **kwargs: Any) -> AsyncGenerator[str, None]:
+        async with self.limiter:
+            async for chunk in self.model.achat_stream(prompt, history, **kwargs):
+                yield chunk
+
+
+def _deployment_limiters(deployment_name: str) -> list[AdaptiveLimiter]:
+    return [limiter for (deployment, _), limiter in _limiters.items() if deployment == deployment_name]
+
+
+def _fnllm_events(chat_model: Any) -> Any:
+    """Events of the fnllm model behind graphrag's chat model and its wrappers, None for other providers."""
+    model = chat_model
+    # Unwrap the instrumentation and graphrag provider down to the fnllm model
+    for _ in range(3):
+        streaming = getattr(model, "_streaming_chat_llm", None)
+        if streaming is not None:
+            return getattr(streaming, "events", None)
+        model = getattr(model, "model", None)
+    return None
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    """Whether an exception raised by an LLM client reports a 429 response."""
+    status_code = getattr(exc, "status_code", None) or getattr(
+        getattr(exc, "response", None), "status_code", None)
+    return status_code == 429 or "RateLimit" in type(exc).__name__
@@ -0,0 +1,261 @@
+import os
+from functools import cached_property
+from pathlib import Path
+from threading import Lock, RLock
+from typing import Callable, ClassVar, List, Mapping, TypeVar
+
+import numpy as np
+from graphrag.config.models.vector_store_schema_config import VectorStoreSchemaConfig
+from graphrag.data_model.community import Community
+from graphrag.data_model.community_report import CommunityReport
+from graphrag.data_model.entity import Entity
+from graphrag.data_model.relationship import Relationship
+from graphrag.data_model.text_unit import TextUnit
+from graphrag.query.indexer_adapters import (
+    read_indexer_communities,
+    read_indexer_entities,
+    read_indexer_relationships,
+    read_indexer_report_embeddings,
+    read_indexer_reports,
+    read_indexer_text_units,
+)
+from graphrag.vector_stores.base import BaseVectorStore
+from graphrag.vector_stores.lancedb import LanceDBVectorStore
+from lancedb import background_loop
+from pandas import DataFrame, read_parquet
+
+from .ann_index import AnnLanceDBVectorStore, AnnSearch
+from .arrow_store import ArrowRecordMap
+from .graph_snapshot import GraphSnapshot
+from .numpy_store import NumpyVectorStore
+
+COMMUNITY_REPORT_TABLE = "community_reports"
+ENTITY_TABLE = "entities"
+COMMUNITY_TABLE = "communities"
+RELATIONSHIP_TABLE = "relationships"
+TEXT_UNIT_TABLE = "text_units"
+COMMUNITY_LEVEL = 2
+ENTITY_DESCRIPTION_INDEX = "default-entity-description"
+FULL_CONTENT_INDEX = "default-community-full_content"
+
+T = TypeVar("T")
+
+
+class GraphArtifacts:
+    """Read-only graph tables and embedding stores loaded from an indexer output folder.
+
+    Each table is only read and converted the first time a search strategy asks for it,
+    so a process running local search never pays for the DRIFT-only report embeddings.
+    Converted tables are cached in a GraphSnapshot to skip the conversion on warm starts,
+    and the `*_store` lookups keep rows in the memory-mapped snapshot until they are used.
+    """
+
+    # Tables read from the parquet files or the snapshot, without opening any LanceDB store
+    TABLES: ClassVar[tuple[str, ...]] = (
+        "entities", "relationships", "community_reports", "communities",
+        "community_report_store", "text_unit_store",
+    )
+    # Runtime options of the approximate searches on the embedding stores, None for LanceDB defaults
+    ANN_SEARCH: ClassVar[AnnSearch | None] = None
+    # Embedding tables up to this size are searched from an in-memory matrix rather than LanceDB, 0 to disable
+    IN_MEMORY_STORE_MAX_ROWS: ClassVar[int] = 20_000
+    # Precision of the in-memory matrices, float16 halves their memory
+    IN_MEMORY_STORE_DTYPE: ClassVar[type] = np.float32
+
+    def __init__(self, graph_path: Path, use_snapshot: bool = True) -> None:
+        self.graph_path = graph_path
+        self._snapshot = GraphSnapshot(graph_path) if use_snapshot else None
+        self._tables: dict[str, DataFrame] = {}
+        self._lock = RLock()
+
+    @cached_property
+    def content_hash(self) -> str:
+        """Hash of the content of every graph artifact, identifying this version of the index."""
+        sources = sorted(file.name for file in self.graph_path.glob("*.parquet")) + ["lancedb"]
+        return (self._snapshot or GraphSnapshot(self.graph_path)).content_hash(sources)
+
+    @cached_property
+    def entities(self) -> List[Entity]:
+        return self._converted(
+            ENTITY_TABLE, Entity, [ENTITY_TABLE, COMMUNITY_TABLE],
+            lambda: read_indexer_entities(
+                self._table(ENTITY_TABLE), self._table(COMMUNITY_TABLE), COMMUNITY_LEVEL))
+
+    @cached_property
+    def description_embedding_store(self) -> BaseVectorStore:
+        return self._vector_store(ENTITY_DESCRIPTION_INDEX)
+
+    @cached_property
+    def full_content_embedding_store(self) -> BaseVectorStore:
+        return self._vector_store(FULL_CONTENT_INDEX)
+
+    @cached_property
+    def relationships(self) -> List[Relationship]:
+        return self._converted(
+            RELATIONSHIP_TABLE, Relationship, [RELATIONSHIP_TABLE],
+            lambda: read_indexer_relationships(self._table(RELATIONSHIP_TABLE)))
+
+    @cached_property
+    def community_reports(self) -> List[CommunityReport]:
+        return self._converted(
+            COMMUNITY_REPORT_TABLE, CommunityReport, [COMMUNITY_REPORT_TABLE, COMMUNITY_TABLE],
+            lambda: read_indexer_reports(
+                self._table(COMMUNITY_REPORT_TABLE), self._table(COMMUNITY_TABLE), COMMUNITY_LEVEL))
+
+    @cached_property
+    def full_content_reports(self) -> List[CommunityReport]:
+        def build() -> List[CommunityReport]:
+            reports = read_indexer_reports(
+                self._table(COMMUNITY_REPORT_TABLE),
+                self._table(COMMUNITY_TABLE),
+                COMMUNITY_LEVEL,
+                content_embedding_col="full_content_embeddings",
+            )
+            read_indexer_report_embeddings(
+                reports, self.full_content_embedding_store)
+            return reports
+
+        return self._converted(
+            "full_content_reports", CommunityReport,
+            [COMMUNITY_REPORT_TABLE, COMMUNITY_TABLE, f"lancedb/{FULL_CONTENT_INDEX}.lance"],
+            build)
+
+    @cached_property
+    def community_report_store(self) -> Mapping[str, CommunityReport]:
+        """Community reports by community id, read on lookup from the memory-mapped snapshot."""
+        return self._stored(
+            COMMUNITY_REPORT_TABLE, CommunityReport, [COMMUNITY_REPORT_TABLE, COMMUNITY_TABLE],
+            lambda: read_indexer_reports(
+                self._table(COMMUNITY_REPORT_TABLE), self._table(COMMUNITY_TABLE), COMMUNITY_LEVEL),
+            key="community_id")
+
+    @cached_property
+    def communities(self) -> List[Community]:
+        return self._converted(
+            COMMUNITY_TABLE, Community, [COMMUNITY_TABLE, COMMUNITY_REPORT_TABLE],
+            lambda: read_indexer_communities(
+                self._table(COMMUNITY_TABLE), self._table(COMMUNITY_REPORT_TABLE)))
+
+    @cached_property
+    def text_units(self) -> List[TextUnit]:
+        return self._converted(
+            TEXT_UNIT_TABLE, TextUnit, [TEXT_UNIT_TABLE],
+            lambda: read_indexer_text_units(self._table(TEXT_UNIT_TABLE)))
+
+    @cached_property
+    def text_unit_store(self) -> Mapping[str, TextUnit]:
+        """Text units by id, read on lookup from the memory-mapped snapshot."""
+        return self._stored(
+            TEXT_UNIT_TABLE, TextUnit, [TEXT_UNIT_TABLE],
+            lambda: read_indexer_text_units(self._table(TEXT_UNIT_TABLE)))
+
+    def load_tables(self) -> None:
+        """Read every graph table and hash the graph content ahead of the searches.
+
+        Processes forked afterwards share the loaded tables instead of reading them again. LanceDB is
+        never called: the threads of its runtime do not survive a fork, so each process reads the
+        embedding stores itself on its first search.
+        """
+        for name in self.TABLES:
+            getattr(self, name)
+        self.content_hash
+
+    def _converted(self, name: str, data_type: type[T], tables: List[str], convert: Callable[[], List[T]]) -> List[T]:
+        """Convert graph tables to graphrag objects, going through the snapshot when enabled."""
+        if self._snapshot is None:
+            return convert()
+        return self._snapshot.load_or_build(name, data_type, self._sources(tables), convert)
+
+    def _stored(self, name: str, data_type: type[T], tables: List[str], convert: Callable[[], List[T]], key: str = "id") -> Mapping[str, T]:
+        """Convert graph tables to a lookup of graphrag objects, backed by Arrow when snapshots are enabled."""
+        if self._snapshot is None:
+            return {getattr(record, key): record for record in convert()}
+        table = self._snapshot.load_table(name, self._sources(tables), convert)
+        return ArrowRecordMap(table, data_type, key)
+
+    @staticmethod
+    def _sources(tables: List[str]) -> List[str]:
+        return [table if table.startswith("lancedb/") else f"{table}.parquet" for table in tables]
+
+    def _table(self, name: str) -> DataFrame:
+        """Read a parquet table of the graph, once."""
+        with self._lock:
+            if name not in self._tables:
+                self._tables[name] = read_parquet(f"{self.graph_path}/{name}.parquet")
+            return self._tables[name]
+
+    def _vector_store(self, index_name: str) -> BaseVectorStore:
+        """Connect to one of the LanceDB embedding tables of the graph, loading it in memory if small enough."""
+        # to connect to a remote db, specify url and port values.
+        schema = VectorStoreSchemaConfig(index_name=index_name)
+        if self.ANN_SEARCH is not None:
+            store = AnnLanceDBVectorStore(self.ANN_SEARCH, vector_store_schema_config=schema)
+        else:
+            store = LanceDBVectorStore(vector_store_schema_config=schema)
+        store.connect(db_uri=f"{self.graph_path}/lancedb")
+        if store.document_collection is None or store.document_collection.count_rows() > self.IN_MEMORY_STORE_MAX_ROWS:
+            return store
+
+        in_memory = NumpyVectorStore(schema, dtype=self.IN_MEMORY_STORE_DTYPE)
+        in_memory.connect(db_uri=f"{self.graph_path}/lancedb")
+        return in_memory
+
+
+class GraphRegistry:
+    """Process-wide registry sharing loaded graph artifacts across contexts.
+
+    Artifacts are keyed by the resolved graph path and the modification times of
+    its parquet and LanceDB files, so an index rewritten on disk is loaded again
+    while unchanged indexes are loaded only once per process.
+    """
+
+    _artifacts: ClassVar[dict[tuple, GraphArtifacts]] = {}
+    _lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def get_or_load(cls, graph_path: Path) -> GraphArtifacts:
+        """Return the artifacts of the graph, registering them on first request."""
+        key = cls.fingerprint(graph_path)
+        with cls._lock:
+            artifacts = cls._artifacts.get(key)
+            if artifacts is None:
+                # Forget previous versions of the same graph before loading the new one
+                for stale_key in [k for k in cls._artifacts if k[0] == key[0]]:
+                    del cls._artifacts[stale_key]
+                artifacts = GraphArtifacts(Path(key[0]))
+                cls._artifacts[key] = artifacts
+            return artifacts
+
+    @classmethod
+    def unload(cls, graph_path: Path) -> None:
+        """Drop every loaded version of the graph, contexts still using it keep their tables."""
+        root = str(Path(graph_path).resolve())
+        with cls._lock:
+            for key in [k for k in cls._artifacts if k[0] == root]:
+                del cls._artifacts[key]
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop every loaded graph from the registry."""
+        with cls._lock:
+            cls._artifacts.clear()
+
+    @staticmethod
+    def fingerprint(graph_path: Path) -> tuple:
+        """Identify a graph by its resolved path and the mtimes of its artifacts."""
+        root = Path(graph_path).resolve()
+        files = sorted(root.glob("*.parquet")) + sorted(root.glob("lancedb/*/_versions"))
+        return (str(root), tuple((str(file.relative_to(root)), file.stat().st_mtime_ns) for file in files))
+
+
+def _restart_lancedb_loop() -> None:
+    """Restart the event loop of LanceDB's sync API in a forked process, its thread being left in the parent.
+
+    LanceDB versions restarting it after a fork themselves already have a running thread.
+    """
+    if not background_loop.LOOP.thread.is_alive():
+        background_loop.LOOP.__init__()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_lancedb_loop)
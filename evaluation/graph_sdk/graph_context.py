@@ -1,118 +1,103 @@
+from functools import cached_property
 from pathlib import Path
-from typing import List
+from typing import List, Mapping
 
-from graphrag.config.enums import ModelType
 from graphrag.config.models.language_model_config import LanguageModelConfig
-from graphrag.config.models.vector_store_schema_config import VectorStoreSchemaConfig
 from graphrag.data_model.community import Community
 from graphrag.data_model.community_report import CommunityReport
-from graphrag.data_model.covariate import Covariate
 from graphrag.data_model.entity import Entity
 from graphrag.data_model.relationship import Relationship
 from graphrag.data_model.text_unit import TextUnit
 from graphrag.language_model.manager import ModelManager
 from graphrag.language_model.protocol.base import ChatModel, EmbeddingModel
-from graphrag.query.indexer_adapters import (
-    read_indexer_communities,
-    read_indexer_entities,
-    read_indexer_relationships,
-    read_indexer_report_embeddings,
-    read_indexer_reports,
-    read_indexer_text_units,
-)
 from graphrag.tokenizer.get_tokenizer import get_tokenizer
 from graphrag.tokenizer.tokenizer import Tokenizer
-from graphrag.vector_stores.lancedb import LanceDBVectorStore
-from pandas import read_parquet
+from graphrag.vector_stores.base import BaseVectorStore
+
+from .embedding_cache import CachedEmbedder, EmbeddingCache
+from .graph_artifacts import GraphRegistry
+from .instrumentation import InstrumentedChatModel, InstrumentedVectorStore
 
 
 class GraphContext:
     """Base class for Graphrag search strategies."""
 
-    entities: List[Entity]
-    description_embedding_store: LanceDBVectorStore
-    relationships: List[Relationship]
-    community_reports: List[CommunityReport]
-    full_content_reports: List[CommunityReport]
-    communities: List[Community]
-    text_units: List[TextUnit]
-    covariates: List[Covariate]
-
     chat_model: ChatModel
     tokenizer: Tokenizer
     text_embedder: EmbeddingModel
 
-    def __init__(self, graph_path: Path, chat_config: LanguageModelConfig, embedding_config: LanguageModelConfig) -> None:
+    def __init__(self, graph_path: Path, chat_config: LanguageModelConfig, embedding_config: LanguageModelConfig,
+                 embedding_cache: EmbeddingCache | None = None) -> None:
         self.load_graph(graph_path)
         self.load_llm(chat_config)
-        self.load_embedding(embedding_config)
+        self.load_embedding(embedding_config, embedding_cache)
         self.tokenizer = get_tokenizer(chat_config)
 
     def load_graph(self, graph_path: Path) -> None:
-        """Load a graph from the specified path."""
-        LANCEDB_URI = f"{graph_path}/lancedb"
-        COMMUNITY_REPORT_TABLE = "community_reports"
-        ENTITY_TABLE = "entities"
-        COMMUNITY_TABLE = "communities"
-        RELATIONSHIP_TABLE = "relationships"
-        COVARIATE_TABLE = "covariates"
-        TEXT_UNIT_TABLE = "text_units"
-        COMMUNITY_LEVEL = 2
-        # Entities
-        entity_df = read_parquet(f"{graph_path}/{ENTITY_TABLE}.parquet")
-        community_df = read_parquet(f"{graph_path}/{COMMUNITY_TABLE}.parquet")
-        report_df = read_parquet(
-            f"{graph_path}/{COMMUNITY_REPORT_TABLE}.parquet")
-
-        self.entities = read_indexer_entities(
-            entity_df, community_df, COMMUNITY_LEVEL)
-
-        # load description embeddings to an in-memory lancedb vectorstore
-        # to connect to a remote db, specify url and port values.
-        self.description_embedding_store = LanceDBVectorStore(
-            vector_store_schema_config=VectorStoreSchemaConfig(
-                index_name="default-entity-description"
-            )
-        )
-        self.description_embedding_store.connect(db_uri=LANCEDB_URI)
-        full_content_embedding_store = LanceDBVectorStore(
-            vector_store_schema_config=VectorStoreSchemaConfig(
-                index_name="default-community-full_content"
-            )
-        )
-        full_content_embedding_store.connect(db_uri=LANCEDB_URI)
+        """Attach the graph at the specified path, sharing tables already loaded by other contexts.
 
-        self.full_content_reports = read_indexer_reports(
-            report_df,
-            community_df,
-            COMMUNITY_LEVEL,
-            content_embedding_col="full_content_embeddings",
-        )
-        read_indexer_report_embeddings(
-            self.full_content_reports, full_content_embedding_store)
+        Tables are only read when a search strategy first accesses them.
+        """
+        self._artifacts = GraphRegistry.get_or_load(graph_path)
+
+    @property
+    def graph_hash(self) -> str:
+        return self._artifacts.content_hash
+
+    @property
+    def entities(self) -> List[Entity]:
+        return self._artifacts.entities
 
-        # Relationships
-        relationship_df = read_parquet(
-            f"{graph_path}/{RELATIONSHIP_TABLE}.parquet")
-        self.relationships = read_indexer_relationships(relationship_df)
+    # Wrapped once, the local, DRIFT and router searches sharing the same instrumented store
+    @cached_property
+    def description_embedding_store(self) -> BaseVectorStore:
+        return InstrumentedVectorStore(self._artifacts.description_embedding_store)  # type: ignore[return-value]
 
-        self.community_reports = read_indexer_reports(
-            report_df, community_df, COMMUNITY_LEVEL)
+    @cached_property
+    def full_content_embedding_store(self) -> BaseVectorStore:
+        return InstrumentedVectorStore(self._artifacts.full_content_embedding_store)  # type: ignore[return-value]
 
-        self.communities = read_indexer_communities(community_df, report_df)
-        text_unit_df = read_parquet(f"{graph_path}/{TEXT_UNIT_TABLE}.parquet")
-        self.text_units = read_indexer_text_units(text_unit_df)
+    @property
+    def relationships(self) -> List[Relationship]:
+        return self._artifacts.relationships
+
+    @property
+    def community_reports(self) -> List[CommunityReport]:
+        return self._artifacts.community_reports
+
+    @property
+    def full_content_reports(self) -> List[CommunityReport]:
+        return self._artifacts.full_content_reports
+
+    @property
+    def community_report_store(self) -> Mapping[str, CommunityReport]:
+        return self._artifacts.community_report_store
+
+    @property
+    def communities(self) -> List[Community]:
+        return self._artifacts.communities
+
+    @property
+    def text_units(self) -> List[TextUnit]:
+        return self._artifacts.text_units
+
+    @property
+    def text_unit_store(self) -> Mapping[str, TextUnit]:
+        return self._artifacts.text_unit_store
 
     def load_llm(self, chat_config: LanguageModelConfig) -> None:
-        self.chat_model = ModelManager().get_or_create_chat_model(
+        self.chat_model = InstrumentedChatModel(ModelManager().get_or_create_chat_model(
             name=str(chat_config.deployment_name),
-            model_type=ModelType.AzureOpenAIChat,
+            model_type=chat_config.type,
             config=chat_config,
-        )
+        ))
 
-    def load_embedding(self, embedding_config: LanguageModelConfig) -> None:
+    def load_embedding(self, embedding_config: LanguageModelConfig, embedding_cache: EmbeddingCache | None = None) -> None:
         self.text_embedder = ModelManager().get_or_create_embedding_model(
             name=str(embedding_config.deployment_name),
-            model_type=ModelType.AzureOpenAIEmbedding,
+            model_type=embedding_config.type,
             config=embedding_config,
         )
+        # The semantic cache, the router and the local search of a query all read the same vector.
+        # Vectors are persisted when an embedding cache is set
+        self.text_embedder = CachedEmbedder(self.text_embedder, embedding_cache)
@@ -1,36 +1,214 @@
+from contextlib import AbstractAsyncContextManager
 from pathlib import Path
+from typing import AsyncGenerator, Iterable
 
+import numpy as np
 from graphrag.config.models.language_model_config import LanguageModelConfig
-from graphrag.query.structured_search.base import SearchResult
+from graphrag.query.structured_search.base import BaseSearch, SearchResult
+from graphrag.query.structured_search.drift_search.search import DRIFTSearch
 
+from .concurrency import observe_llm_events
+from .embedding_cache import CachedEmbedder, EmbeddingCache
 from .graph_context import GraphContext
+from .instrumentation import InstrumentedContextBuilder, SearchMetrics, measure_search
+from .numpy_store import NumpyVectorStore
+from .result_cache import SearchResultCache
 from .search_builder import Drift, Global, Local, SearchType
+from .search_router import RoutingDecision, SearchRouter
+from .semantic_cache import SemanticCache
+
+SEARCH_STRATEGIES = {
+    SearchType.LOCAL: Local,
+    SearchType.GLOBAL: Global,
+    SearchType.DRIFT: Drift,
+}
+# Candidate entities searched per mapped entity by LocalSearchMixedContext
+LOCAL_ENTITY_OVERSAMPLING = 2
 
 
 class GraphExplorer:
 
-    def __init__(self, graph_path: Path, chat_config: LanguageModelConfig, embedding_config: LanguageModelConfig) -> None:
+    def __init__(self, graph_path: Path, chat_config: LanguageModelConfig, embedding_config: LanguageModelConfig,
+                 llm_limiter: AbstractAsyncContextManager | None = None,
+                 result_cache: SearchResultCache | None = None,
+                 embedding_cache: EmbeddingCache | None = None,
+                 semantic_cache: SemanticCache | None = None) -> None:
+        self._graph_path = graph_path
         self._graph_context = GraphContext(graph_path=graph_path,
                                            chat_config=chat_config,
-                                           embedding_config=embedding_config)
-        self._local = Local.build(self._graph_context)
-        self._global = Global.build(self._graph_context)
-        self._drift = Drift.build(self._graph_context)
-
-    async def search(self, query: str, type: SearchType = SearchType.LOCAL) -> SearchResult:
-        match type:
-            case SearchType.LOCAL:
-                return await self._local.search(query)
-            case SearchType.GLOBAL:
-                return await self._global.search(query)
-            case SearchType.DRIFT:
-                return await self._drift.search(query)
+                                           embedding_config=embedding_config,
+                                           embedding_cache=embedding_cache)
+        self._embedding_config = embedding_config
+        self._llm_limiter = llm_limiter
+        # Rate-limited retries and token usage of the chat model feed the limiters of its deployment
+        observe_llm_events(self._graph_context.chat_model, str(chat_config.deployment_name))
+        self._result_cache = result_cache
+        self._semantic_cache = semantic_cache
+        self._engines: dict[SearchType, BaseSearch] = {}
+        self._router = SearchRouter(self._graph_context)
+        self._primed_stores: list[NumpyVectorStore] = []
+
+    async def search(self, query: str, type: SearchType = SearchType.LOCAL, use_cache: bool = True) -> SearchResult:
+        """Search the graph, reusing the result of an identical previous search when a result cache is set.
+
+        With a semantic cache, the result of a similar enough previous query is reused as well.
+        With `use_cache` set to False, the search always runs and its result replaces the cached one.
+        """
+        result, _ = await self.instrumented_search(query, type, use_cache)
+        return result
+
+    async def instrumented_search(self, query: str, type: SearchType = SearchType.LOCAL,
+                                  use_cache: bool = True) -> tuple[SearchResult, SearchMetrics]:
+        """Search the graph like `search`, also returning the latency and token usage of each stage."""
+        if use_cache and (result := self.cached_search(query, type)) is not None:
+            return result, SearchMetrics.from_cached(type.value, result)
+
+        embedding = None
+        if self._semantic_cache is not None and query.strip():
+            # Embedded once more by the local search, read back from the embedder's memory
+            embedding = await self._graph_context.text_embedder.aembed(query)
+            if use_cache and (result := self._semantic_cache.get(*self._semantic_scope(type), embedding)) is not None:
+                return result, SearchMetrics.from_cached(type.value, result)
+
+        with measure_search(type.value, query) as metrics:
+            result = await self._engine(type).search(query)
+            metrics.record_result(result)
+        if self._result_cache is not None:
+            self._result_cache.put(self._cache_key(query, type), result)
+        if self._semantic_cache is not None and embedding is not None:
+            self._semantic_cache.put(*self._semantic_scope(type), embedding, result)
+        return result, metrics
+
+    async def stream_search(self, query: str, type: SearchType = SearchType.LOCAL) -> AsyncGenerator[str, None]:
+        """Search the graph, yielding the response as the chat model generates it.
+
+        DRIFT search does not stream, its response is yielded once complete, as are cached results.
+        Streamed responses are not cached: graphrag does not return their context data.
+        """
+        result = self.cached_search(query, type)
+        if result is None and type == SearchType.DRIFT:
+            result = await self.search(query, type, use_cache=False)
+        if result is not None:
+            yield str(result.response)
+            return
+
+        async for chunk in self._engine(type).stream_search(query):
+            yield chunk
+
+    def cached_search(self, query: str, type: SearchType = SearchType.LOCAL) -> SearchResult | None:
+        """Get the cached result of an identical previous search, without querying the graph."""
+        if self._result_cache is None:
+            return None
+        return self._result_cache.get(self._cache_key(query, type))
+
+    async def route(self, query: str) -> RoutingDecision:
+        """Pick the cheapest search strategy adequate for the query, see `SearchRouter`."""
+        return await self._router.route(query)
+
+    def preload(self, types: Iterable[SearchType] = (SearchType.LOCAL,)) -> None:
+        """Build the search engines ahead of the first searches, reading the graph tables they need."""
+        for type in types:
+            self._engine(type)
+
+    async def prefetch_embeddings(self, queries: Iterable[str]) -> None:
+        """Embed the queries in bulk ahead of the searches."""
+        text_embedder = self._graph_context.text_embedder
+        if isinstance(text_embedder, CachedEmbedder):
+            await text_embedder.prefetch(queries)
+
+    async def prime_entity_lookups(self, queries: Iterable[str]) -> bool:
+        """Look up the entities of every query in a single batch ahead of their local searches.
+
+        The queries are embedded in bulk, then the candidate entities of all of them are searched with
+        one matrix product over the in-memory entity embeddings. Each local search then reads its
+        candidates instead of searching the store, the candidates being released once read. Candidates
+        of queries never searched, e.g. whose search failed, are released by `clear_entity_lookups`.
+        Only applies when the entity embeddings are in memory.
+
+        Returns:
+            Whether the lookups were primed
+        """
+        text_embedder = self._graph_context.text_embedder
+        # Unwrapped from the instrumentation of the context, priming is not part of any search
+        store = getattr(self._graph_context.description_embedding_store, "store", None)
+        if not isinstance(text_embedder, CachedEmbedder) or not isinstance(store, NumpyVectorStore):
+            return False
+        queries = [query for query in dict.fromkeys(queries) if query]
+        embeddings = await text_embedder.aembed_batch(queries)
+        # LocalSearchMixedContext oversamples the mapped entities, to make up for the excluded ones
+        k = Local.CONTEXT_PARAMS["top_k_mapped_entities"] * LOCAL_ENTITY_OVERSAMPLING
+        store.prime(np.asarray(embeddings, dtype=np.float32), k)
+        self._primed_stores.append(store)
+        return True
+
+    def clear_entity_lookups(self) -> None:
+        """Release the entity lookups primed by `prime_entity_lookups` that no search read.
+
+        Lookups primed by other explorers of the same graph are kept until they clear theirs too.
+        """
+        while self._primed_stores:
+            self._primed_stores.pop().clear_primed()
+
+    def search_version(self, type: SearchType = SearchType.LOCAL) -> str:
+        """Identify the graph, models and search parameters a search runs with, its result being stable for a query."""
+        return SearchResultCache.key(**self._search_fields(type))
+
+    def _engine(self, type: SearchType) -> BaseSearch:
+        """Get the search engine for the given strategy, building it on first use."""
+        if type not in self._engines:
+            match type:
+                case SearchType.LOCAL:
+                    self._engines[type] = Local.build(self._graph_context)
+                case SearchType.GLOBAL:
+                    self._engines[type] = Global.build(self._graph_context, self._llm_limiter)
+                case SearchType.DRIFT:
+                    self._engines[type] = Drift.build(self._graph_context)
+            engine = self._engines[type]
+            engine.context_builder = InstrumentedContextBuilder(engine.context_builder)  # type: ignore[assignment]
+            if isinstance(engine, DRIFTSearch):
+                # DRIFT follow-up actions build their own local search contexts
+                engine.local_search.context_builder = InstrumentedContextBuilder(
+                    engine.local_search.context_builder)  # type: ignore[assignment]
+        return self._engines[type]
+
+    def _cache_key(self, query: str, type: SearchType) -> str:
+        """Identify a search by everything its result depends on."""
+        return SearchResultCache.key(query=query, **self._search_fields(type))
+
+    def _semantic_scope(self, type: SearchType) -> tuple[tuple, str]:
+        """Scope of the graph, search type and chat deployment in the semantic cache, and the version of its results.
+
+        Results of a previous version of the graph or of the search parameters are dropped on the next put.
+        """
+        scope = (str(Path(self._graph_path).resolve()), type.value, self.model_deployment_name)
+        return scope, self.search_version(type)
+
+    def _search_fields(self, type: SearchType) -> dict:
+        """Everything the result of a search depends on, besides its query."""
+        return dict(
+            type=type.value,
+            graph=self._graph_context.graph_hash,
+            chat_deployment=self.model_deployment_name,
+            chat_model=self.model_name,
+            embedding_deployment=self._embedding_config.deployment_name,
+            params=SEARCH_STRATEGIES[type].params(),
+        )
     
+    @property
+    def graph_hash(self) -> str:
+        """Hash of the graph artifacts, identifying the version of the index being searched."""
+        return self._graph_context.graph_hash
+
     @property
     def model_deployment_name(self) -> str | None:
         """Get the deployment name of the chat model."""
         return self._graph_context.chat_model.config.deployment_name
     
+    @property
+    def model_config(self) -> LanguageModelConfig:
+        """Get the configuration of the chat model."""
+        return self._graph_context.chat_model.config
+
     @property
     def model_name(self) -> str | None:
         """Get the name of the chat model."""
@@ -0,0 +1,125 @@
+import logging
+import os
+import tempfile
+from hashlib import sha256
+from pathlib import Path
+from typing import Callable, Iterable, TypeVar
+
+import pyarrow as pa
+
+from .arrow_store import from_row, to_row
+
+SNAPSHOT_VERSION = 2
+# Characters of the content hash in the snapshot file names
+_HASH_LENGTH = 16
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class GraphSnapshot:
+    """On-disk snapshot of the graph tables once converted by the graphrag indexer adapters.
+
+    Converted tables are stored as uncompressed Arrow IPC files in a `snapshot/<output folder>`
+    folder next to the indexer output, and memory-mapped when read back. Each file name carries
+    a hash of the snapshot version and of the content of the source artifacts it was
+    built from, so a rebuilt index never reads a stale snapshot.
+    """
+
+    def __init__(self, graph_path: Path) -> None:
+        self.graph_path = graph_path
+        # One folder per graph, so that graphs sharing a parent folder never replace each other's snapshots
+        self.root = graph_path.parent / "snapshot" / graph_path.name
+        self._file_hashes: dict[Path, str] = {}
+
+    def load_or_build(self, name: str, data_type: type[T], sources: Iterable[str], build: Callable[[], list[T]]) -> list[T]:
+        """Load a converted table from the snapshot, or build it and save it for the next start.
+
+        Args:
+            name: Name of the converted table
+            data_type: Graphrag dataclass of the table rows
+            sources: Graph artifacts (relative to the graph path) the table is built from
+            build: Callable converting the source artifacts into the table rows
+        """
+        path = self._path(name, sources)
+        if path.exists():
+            return [from_row(row, data_type) for row in self._read(path).to_pylist()]
+
+        rows = build()
+        self._save(path, rows)
+        return rows
+
+    def load_table(self, name: str, sources: Iterable[str], build: Callable[[], list]) -> pa.Table:
+        """Get a converted table as a memory-mapped Arrow table, building the snapshot if needed.
+
+        Args:
+            name: Name of the converted table
+            sources: Graph artifacts (relative to the graph path) the table is built from
+            build: Callable converting the source artifacts into the table rows
+        """
+        path = self._path(name, sources)
+        if not path.exists():
+            rows = build()
+            if not self._save(path, rows):
+                # Snapshot folder is not writable, keep the table in memory
+                return pa.Table.from_pylist([to_row(row) for row in rows])
+        return self._read(path)
+
+    def _path(self, name: str, sources: Iterable[str]) -> Path:
+        return self.root / f"{name}-{self.content_hash(sources)[:_HASH_LENGTH]}.arrow"
+
+    def content_hash(self, sources: Iterable[str]) -> str:
+        """Hash the content of graph artifacts (files or folders relative to the graph path)."""
+        digest = sha256(f"v{SNAPSHOT_VERSION}".encode())
+        for source in sources:
+            path = self.graph_path / source
+            files = sorted(path.rglob("*")) if path.is_dir() else [path]
+            for file in files:
+                if file.is_file():
+                    digest.update(str(file.relative_to(self.graph_path)).encode())
+                    digest.update(self._file_hash(file).encode())
+        return digest.hexdigest()
+
+    def _file_hash(self, file: Path) -> str:
+        """Hash the content of an artifact, once per snapshot instance."""
+        if file not in self._file_hashes:
+            digest = sha256()
+            with file.open("rb") as f:
+                while chunk := f.read(1 << 20):
+                    digest.update(chunk)
+            self._file_hashes[file] = digest.hexdigest()
+        return self._file_hashes[file]
+
+    def _read(self, path: Path) -> pa.Table:
+        """Memory-map a snapshot file. Buffers are read lazily from the OS page cache."""
+        with pa.memory_map(str(path), "r") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def _save(self, path: Path, rows: list) -> bool:
+        """Write rows to a snapshot file. Returns whether the snapshot is available."""
+        if not rows:
+            return False
+        table = pa.Table.from_pylist([to_row(row) for row in rows])
+        tmp_path = None
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file of this process first, so concurrent readers never see a partial
+            # snapshot and concurrent writers never write to the same file
+            with tempfile.NamedTemporaryFile(dir=self.root, prefix=f"{path.stem}-", suffix=".tmp", delete=False) as tmp:
+                tmp_path = tmp.name
+            with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write graph snapshot %s: %s", path, e)
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+            return False
+
+        # Previous snapshots of the same table are now stale
+        table_name = path.stem.rsplit("-", 1)[0]
+        for stale in self.root.glob(f"{table_name}-{'?' * _HASH_LENGTH}.arrow"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        return True
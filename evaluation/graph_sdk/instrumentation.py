@@ -0,0 +1,158 @@
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncGenerator, Generator, Iterator
+
+from graphrag.query.structured_search.base import SearchResult
+
+try:
+    from opentelemetry import trace
+
+    _tracer = trace.get_tracer("graph_sdk")
+except ImportError:  # OpenTelemetry is optional, metrics are still collected without it
+    _tracer = None
+
+_current_metrics: ContextVar["SearchMetrics | None"] = ContextVar("search_metrics", default=None)
+
+
+@dataclass
+class SearchMetrics:
+    """Latency and token usage of a single search.
+
+    Stage durations are summed over every call of the stage, so concurrent LLM calls (global
+    map step, DRIFT follow-ups) can add up to more than the search latency. Vector lookups
+    happen while building the context and are included in `context_build_s`.
+    """
+
+    search_type: str
+    latency_s: float = 0.0
+    context_build_s: float = 0.0
+    vector_lookup_s: float = 0.0
+    llm_s: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    cached: bool = False
+
+    def record_result(self, result: SearchResult) -> None:
+        """Copy the LLM usage counted by graphrag while searching."""
+        self.llm_calls = result.llm_calls
+        self.prompt_tokens = result.prompt_tokens
+        self.output_tokens = result.output_tokens
+
+    @classmethod
+    def from_cached(cls, search_type: str, result: SearchResult) -> "SearchMetrics":
+        """Metrics of a result read from the cache, with the LLM usage it cost when it was computed."""
+        metrics = cls(search_type=search_type, cached=True)
+        metrics.record_result(result)
+        return metrics
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@contextmanager
+def measure_search(search_type: str, query: str) -> Iterator[SearchMetrics]:
+    """Collect the metrics of the stages run within the block, as a `graphrag.search` span when tracing."""
+    metrics = SearchMetrics(search_type=search_type)
+    token = _current_metrics.set(metrics)
+    span_context = _tracer.start_as_current_span("graphrag.search") if _tracer else _no_span()
+    start = time.perf_counter()
+    try:
+        with span_context as span:
+            yield metrics
+            metrics.latency_s = time.perf_counter() - start
+            if span is not None:
+                span.set_attribute("graphrag.query", query)
+                for name, value in metrics.to_dict().items():
+                    span.set_attribute(f"graphrag.{name}", value)
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextmanager
+def measure_stage(stage: str) -> Iterator[None]:
+    """Add the duration of the block to a stage of the current search, as a child span when tracing."""
+    metrics = _current_metrics.get()
+    # Not made current: the block may be an async generator resumed from other contexts
+    span = _tracer.start_span(f"graphrag.{stage}") if _tracer else None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            setattr(metrics, f"{stage}_s", getattr(metrics, f"{stage}_s") + time.perf_counter() - start)
+        if span is not None:
+            span.end()
+
+
+class InstrumentedChatModel:
+    """Chat model measuring the time spent in the wrapped model calls."""
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+    async def achat(self, prompt: str, history: list | None = None, **kwargs: Any) -> Any:
+        with measure_stage("llm"):
+            return await self.model.achat(prompt, history, **kwargs)
+
+    async def achat_stream(self, prompt: str, history: list | None = None, **kwargs: Any) -> AsyncGenerator[str, None]:
+        with measure_stage("llm"):
+            async for chunk in self.model.achat_stream(prompt, history, **kwargs):
+                yield chunk
+
+    def chat(self, prompt: str, history: list | None = None, **kwargs: Any) -> Any:
+        with measure_stage("llm"):
+            return self.model.chat(prompt, history, **kwargs)
+
+    def chat_stream(self, prompt: str, history: list | None = None, **kwargs: Any) -> Generator[str, None, None]:
+        with measure_stage("llm"):
+            yield from self.model.chat_stream(prompt, history, **kwargs)
+
+
+class InstrumentedVectorStore:
+    """Vector store measuring the time spent in similarity searches, query embedding included."""
+
+    def __init__(self, store: Any) -> None:
+        self.store = store
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.store, name)
+
+    def similarity_search_by_text(self, *args: Any, **kwargs: Any) -> Any:
+        with measure_stage("vector_lookup"):
+            return self.store.similarity_search_by_text(*args, **kwargs)
+
+    def similarity_search_by_vector(self, *args: Any, **kwargs: Any) -> Any:
+        with measure_stage("vector_lookup"):
+            return self.store.similarity_search_by_vector(*args, **kwargs)
+
+
+class InstrumentedContextBuilder:
+    """Context builder measuring the time spent building search contexts."""
+
+    def __init__(self, builder: Any) -> None:
+        self.builder = builder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.builder, name)
+
+    def build_context(self, *args: Any, **kwargs: Any) -> Any:
+        if inspect.iscoroutinefunction(self.builder.build_context):
+            return self._abuild_context(*args, **kwargs)
+        with measure_stage("context_build"):
+            return self.builder.build_context(*args, **kwargs)
+
+    async def _abuild_context(self, *args: Any, **kwargs: Any) -> Any:
+        with measure_stage("context_build"):
+            return await self.builder.build_context(*args, **kwargs)
+
+
+@contextmanager
+def _no_span() -> Iterator[None]:
+    yield None
@@ -5,20 +5,26 @@ from graphrag.query.structured_search.drift_search.drift_context import (
 from graphrag.query.structured_search.drift_search.search import DRIFTSearch
 
 from ..graph_context import GraphContext
+from .local_search_builder import Local
 
 
 class Drift:
     """Graphrag DRIFT Search strategy."""
 
+    CONFIG = DRIFTSearchConfig(
+        primer_folds=1,
+        drift_k_followups=3,
+        n_depth=3,
+    )
+
+    @classmethod
+    def params(cls) -> dict:
+        """Parameters shaping the search results, used to key cached results."""
+        return {"config": cls.CONFIG.model_dump()}
+
     @staticmethod
     def build(ctx: GraphContext) -> DRIFTSearch:
         """Create and configure a DRIFTSearch instance."""
-        drift_params = DRIFTSearchConfig(
-            primer_folds=1,
-            drift_k_followups=3,
-            n_depth=3,
-        )
-
         context_builder = DRIFTSearchContextBuilder(
             model=ctx.chat_model,
             text_embedder=ctx.text_embedder,
@@ -26,9 +32,9 @@ class Drift:
             relationships=ctx.relationships,
             reports=ctx.full_content_reports,
             entity_text_embeddings=ctx.description_embedding_store,
-            text_units=ctx.text_units,
             tokenizer=ctx.tokenizer,
-            config=drift_params,
+            config=Drift.CONFIG,
+            local_mixed_context=Local.context_builder(ctx),
         )
 
         return DRIFTSearch(
@@ -10,12 +10,45 @@ from ..graph_context import GraphContext
 class Local:
     """Graphrag Local Search strategy."""
 
+    CONTEXT_PARAMS = {
+        "text_unit_prop": 0.5,
+        "community_prop": 0.1,
+        "conversation_history_max_turns": 5,
+        "conversation_history_user_turns_only": True,
+        "top_k_mapped_entities": 10,
+        "top_k_relationships": 10,
+        "include_entity_rank": True,
+        "include_relationship_weight": True,
+        "include_community_rank": False,
+        "return_candidate_context": False,
+        # set this to EntityVectorStoreKey.TITLE if the vectorstore uses entity title as ids
+        "embedding_vectorstore_key": EntityVectorStoreKey.ID,
+        # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 5000)
+        "max_tokens": 12_000,
+    }
+
+    MODEL_PARAMS = {
+        # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 1000=1500)
+        "max_tokens": 2_000,
+        "temperature": 0.0,
+    }
+
+    # free form text describing the response type and format, can be anything, e.g. prioritized list, single paragraph, multiple paragraphs, multiple-page report
+    RESPONSE_TYPE = "multiple paragraphs"
+
+    @classmethod
+    def params(cls) -> dict:
+        """Parameters shaping the search results, used to key cached results."""
+        return {
+            "context_params": cls.CONTEXT_PARAMS,
+            "model_params": cls.MODEL_PARAMS,
+            "response_type": cls.RESPONSE_TYPE,
+        }
+
     @staticmethod
-    def build(ctx: GraphContext) -> LocalSearch:
-        """Create and configure a LocalSearch instance."""
+    def context_builder(ctx: GraphContext) -> LocalSearchMixedContext:
+        """Create the local context builder, shared with the DRIFT strategy."""
         context_builder = LocalSearchMixedContext(
-            community_reports=ctx.community_reports,
-            text_units=ctx.text_units,
             entities=ctx.entities,
             relationships=ctx.relationships,
             # if you did not run covariates during indexing, set this to None
@@ -26,35 +59,21 @@ class Local:
             text_embedder=ctx.text_embedder,
             tokenizer=ctx.tokenizer,
         )
-        local_context_params = {
-            "text_unit_prop": 0.5,
-            "community_prop": 0.1,
-            "conversation_history_max_turns": 5,
-            "conversation_history_user_turns_only": True,
-            "top_k_mapped_entities": 10,
-            "top_k_relationships": 10,
-            "include_entity_rank": True,
-            "include_relationship_weight": True,
-            "include_community_rank": False,
-            "return_candidate_context": False,
-            # set this to EntityVectorStoreKey.TITLE if the vectorstore uses entity title as ids
-            "embedding_vectorstore_key": EntityVectorStoreKey.ID,
-            # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 5000)
-            "max_tokens": 12_000,
-        }
-
-        model_params = {
-            # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 1000=1500)
-            "max_tokens": 2_000,
-            "temperature": 0.0,
-        }
+        # Reports and text units are only looked up by id, so read them on demand
+        # from the memory-mapped graph snapshot instead of materializing them all.
+        context_builder.community_reports = ctx.community_report_store
+        context_builder.text_units = ctx.text_unit_store
+        return context_builder
 
+    @staticmethod
+    def build(ctx: GraphContext) -> LocalSearch:
+        """Create and configure a LocalSearch instance."""
+        context_builder = Local.context_builder(ctx)
         return LocalSearch(
             model=ctx.chat_model,
             context_builder=context_builder,
             tokenizer=ctx.tokenizer,
-            model_params=model_params,
-            context_builder_params=local_context_params,
-            # free form text describing the response type and format, can be anything, e.g. prioritized list, single paragraph, multiple paragraphs, multiple-page report
-            response_type="multiple paragraphs",
+            model_params=Local.MODEL_PARAMS,
+            context_builder_params=Local.CONTEXT_PARAMS,
+            response_type=Local.RESPONSE_TYPE,
         )
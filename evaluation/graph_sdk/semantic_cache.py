@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Hashable
+
+import numpy as np
+from graphrag.query.structured_search.base import SearchResult
+
+# Rows allocated for the embeddings of a new scope, doubled when full up to `max_entries`
+_INITIAL_CAPACITY = 64
+
+
+@dataclass
+class _Scope:
+    version: Hashable
+    embeddings: np.ndarray
+    """Ring buffer of the normalized embeddings, its first `size` rows are filled"""
+    results: list[SearchResult] = field(default_factory=list)
+    size: int = 0
+    next: int = 0
+    """Row of the next result, overwriting the oldest one once `max_entries` are cached"""
+
+
+class SemanticCache:
+    """In-memory cache of search results, matching queries by embedding similarity.
+
+    A query is served the result of the closest previous query whose cosine similarity is at
+    least `threshold`, so paraphrases of a question share its answer. So may similarly worded questions
+    about different entities, the cache should only be enabled knowingly. Results are grouped in
+    scopes, tuples starting with the resolved graph path (e.g. with the search type and chat
+    deployment), each one tagged with a version identifying the graph content, models and
+    parameters: storing a result under a new version drops every result of the previous one.
+    Past `max_entries` per scope, the oldest results are overwritten in place.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 10_000) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._scopes: dict[tuple, _Scope] = {}
+        self._lock = Lock()
+
+    def get(self, scope: tuple, version: Hashable, embedding: list[float]) -> SearchResult | None:
+        """Get the result of the most similar cached query, None if none is similar enough."""
+        with self._lock:
+            cached = self._scopes.get(scope)
+            if cached is None or cached.version != version or not cached.results:
+                return None
+            similarities = cached.embeddings[:cached.size] @ _normalized(embedding)
+            best = int(np.argmax(similarities))
+            return cached.results[best] if similarities[best] >= self.threshold else None
+
+    def put(self, scope: tuple, version: Hashable, embedding: list[float], result: SearchResult) -> None:
+        """Cache the result of a query, replacing the results of any other version of the scope."""
+        vector = _normalized(embedding)
+        with self._lock:
+            cached = self._scopes.get(scope)
+            if cached is None or cached.version != version:
+                capacity = min(_INITIAL_CAPACITY, self.max_entries)
+                cached = self._scopes[scope] = _Scope(version, np.empty((capacity, len(vector)), dtype=np.float32))
+            elif cached.size == len(cached.embeddings) < self.max_entries:
+                grown = np.empty((min(2 * cached.size, self.max_entries), len(vector)), dtype=np.float32)
+                grown[:cached.size] = cached.embeddings
+                cached.embeddings = grown
+            cached.embeddings[cached.next] = vector
+            if cached.next < len(cached.results):
+                cached.results[cached.next] = result
+            else:
+                cached.results.append(result)
+            cached.next = (cached.next + 1) % self.max_entries
+            cached.size = min(cached.size + 1, self.max_entries)
+
+    def invalidate(self, graph_path: Path | None = None) -> None:
+        """Drop the results of every scope of a graph, or of every graph."""
+        root = str(Path(graph_path).resolve()) if graph_path is not None else None
+        with self._lock:
+            for scope in [scope for scope in self._scopes if root is None or scope[0] == root]:
+                del self._scopes[scope]
+
+
+def _normalized(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
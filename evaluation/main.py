@@ -2,19 +2,36 @@ import asyncio
 import json
 from functools import partial
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict
 
+from azure.ai.evaluation import AzureOpenAIModelConfiguration, EvaluationResult
 from graphrag.config.enums import ModelType
 
+from app_config import settings
+from config.model_factory import ModelFactory
 from evaluator_workflow import evaluate_cloud, evaluate_locally
-from graph_sdk import GraphExplorer, SearchType
+from graph_sdk import GraphExplorer, SearchMetrics, SearchResult, SearchType
 from main_setup import initialize
 from utils import console
-from utils.concurrency import limit_concurrency
-from utils.json_utils import DatasetEntry
+from utils.concurrency import AdaptiveLimiter, limiter_for
+from utils.judge_cache import JudgeCache
+from utils.json_utils import (
+    DatasetEntry,
+    JsonlDatasetWriter,
+    load_written_queries,
+)
 
-# Limit to 3 concurrent searches
-search_limiter = asyncio.Semaphore(3)
+# Start with 3 concurrent searches per chat deployment, adapted to its throttling. The latency of a search
+# includes its waits on the limiter of its LLM calls, which adapts to the latency of the deployment itself
+SEARCH_CONCURRENCY = {"initial_limit": 3, "max_limit": 16, "latency_tolerance": None}
+
+# Keep the responses of a previous, interrupted run and only query the missing entries.
+# Responses generated from another version of the graph, models or search parameters are never reused
+RESUME_GENERATION = True
+
+# Reuse the cached result of identical searches (same query, graph, models and search parameters).
+# Set to False to query the graph again and refresh the cache.
+USE_SEARCH_CACHE = True
 
 
 async def main():
@@ -24,46 +41,144 @@ async def main():
     aoai_config = factory.get_simple_model("gpt5", ModelType.AzureOpenAIChat)
     assert aoai_config is not None, "Failed to get Azure OpenAI model configuration."
 
-    # For each GraphRAG implementation (sample-gpt4, sample-gpt5)...
-    for graph_explorer in graph_explorers:
-        rag_model = graph_explorer.model_deployment_name
-
-        # Step 1 : Query the graph concurrently for all dataset entries
-        graph_search = partial(__search, graph_explorer)
-        responses = await asyncio.gather(*map(graph_search, dataset_entries))
-
-        # Step 2 : Create the corresponding dataset
-        dataset = Path(f"assets/generated_dataset_{rag_model}.jsonl")
-        with dataset.open("w") as f:
-            for entry in responses:
-                f.write(f'{json.dumps(entry)}\n')
-
-        # Step 3 : Evaluate the dataset locally or in cloud
-        evaluation_result = evaluate_locally(dataset, aoai_config)
-
-        # NOTE : Uncomment below to run cloud evaluators
-        # project_url = settings.project_defaults.api_base
-        # evaluation_deployment_name = settings.project_defaults.cloud_evaluation_deployment_name
-        # run_cloud_evaluators(dataset, project_url, evaluation_deployment_name)
-
-        console.print(evaluation_result)
+    # Scores of rows unchanged since a previous run are read back instead of calling the judge again
+    judge_cache = JudgeCache(Path(settings.judge_cache.path))
+
+    # Skip the queries already answered by a previous, interrupted run of the same graph and models,
+    # then read the cached results of the pending ones once
+    pending_entries = [__pending_entries(graph_explorer, dataset_entries) for graph_explorer in graph_explorers]
+    cached_results = [__cached_results(graph_explorer, pending)
+                      for graph_explorer, pending in zip(graph_explorers, pending_entries)]
+
+    # Embed every pending query in bulk once, explorers sharing the embedding deployment then read them from the cache.
+    # The entity lookups of every local search are then run as one batch per graph.
+    # Queries answered from the search cache are left out, as they will not be searched
+    for graph_explorer, pending, cached in zip(graph_explorers, pending_entries, cached_results):
+        queries = [entry.query for entry in pending if entry.query.strip() and entry.query not in cached]
+        await graph_explorer.prefetch_embeddings(queries)
+        await graph_explorer.prime_entity_lookups(queries)
+
+    # Run every GraphRAG implementation (sample-gpt4, sample-gpt5) at once. Searches are bounded
+    # per chat deployment, and each variant is evaluated as soon as its own dataset is complete
+    variants = [__run_variant(graph_explorer, pending, cached, aoai_config, judge_cache, factory)
+                for graph_explorer, pending, cached in zip(graph_explorers, pending_entries, cached_results)]
+    results = await asyncio.gather(*variants, return_exceptions=True)
+
+    metrics_by_variant = {}
+    for graph_explorer, result in zip(graph_explorers, results):
+        if isinstance(result, BaseException):
+            console.print(
+                f"[bold red]❌ Evaluation of {graph_explorer.model_deployment_name} failed: {result!r}[/bold red]")
+        else:
+            metrics_by_variant[str(graph_explorer.model_deployment_name)] = result["metrics"]
+
+    # Quality scores next to the latency and cost of each variant
+    console.print_metrics_comparison("Evaluation summary", metrics_by_variant)
+
+
+async def __run_variant(graph_explorer: GraphExplorer, pending: list[DatasetEntry],
+                        cached: dict[str, SearchResult], aoai_config: AzureOpenAIModelConfiguration, judge_cache: JudgeCache,
+                        factory: ModelFactory) -> EvaluationResult:
+    """
+    Query a GraphRAG implementation for every pending dataset entry, then evaluate its responses.
+    """
+    rag_model = graph_explorer.model_deployment_name
+    dataset = __dataset_path(graph_explorer)
+
+    # Step 1 : Query the graph concurrently for the pending entries, appending each response to
+    # the dataset as soon as it completes. Responses of another graph or model version are dropped
+    graph_search = partial(__search, graph_explorer, cached)
+    try:
+        with JsonlDatasetWriter(dataset, version=graph_explorer.search_version(SearchType.LOCAL)) as writer:
+            for response in asyncio.as_completed(map(graph_search, pending)):
+                writer.write(await response)
+    finally:
+        # Entity lookups primed for queries whose search failed are never read
+        graph_explorer.clear_entity_lookups()
+
+    # Step 2 : Evaluate the dataset locally or in cloud.
+    # Evaluation is blocking, run it in a thread so other variants keep searching meanwhile.
+    # The search latency, LLM usage and cost recorded in the dataset are reported along the scores
+    evaluation_result = await asyncio.to_thread(
+        evaluate_locally, dataset, aoai_config, judge_cache=judge_cache,
+        pricing=factory.get_pricing(str(rag_model)))
+
+    # NOTE : Uncomment below to run cloud evaluators
+    # project_url = settings.project_defaults.api_base
+    # evaluation_deployment_name = settings.project_defaults.cloud_evaluation_deployment_name
+    # run_cloud_evaluators(dataset, project_url, evaluation_deployment_name)
+
+    console.print(f"[bold cyan]📊 Evaluation of {rag_model}[/bold cyan]")
+    console.print(evaluation_result)
+    return evaluation_result
+
+
+def __dataset_path(explorer: GraphExplorer) -> Path:
+    return Path(f"assets/generated_dataset_{explorer.model_deployment_name}.jsonl")
+
+
+def __pending_entries(explorer: GraphExplorer, dataset_entries: list[DatasetEntry]) -> list[DatasetEntry]:
+    """
+    Get the dataset entries not yet answered by the same graph, models and search parameters.
+    """
+    dataset = __dataset_path(explorer)
+    if not RESUME_GENERATION:
+        dataset.unlink(missing_ok=True)
+    answered = load_written_queries(dataset, version=explorer.search_version(SearchType.LOCAL))
+    pending = [entry for entry in dataset_entries if entry.query not in answered]
+    if answered:
+        console.print(
+            f"[yellow]⏩ Resuming {dataset}: {len(dataset_entries) - len(pending)} queries already answered[/yellow]")
+    return pending
+
+
+def __cached_results(explorer: GraphExplorer, entries: list[DatasetEntry]) -> dict[str, SearchResult]:
+    """
+    Get the cached search results of the dataset entries, by query.
+    """
+    if not USE_SEARCH_CACHE:
+        return {}
+    results = {entry.query: explorer.cached_search(entry.query, SearchType.LOCAL) for entry in entries}
+    return {query: result for query, result in results.items() if result is not None}
 
 
-@limit_concurrency(search_limiter)
-async def __search(explorer: GraphExplorer, entry: DatasetEntry) -> Dict[str, str]:
+async def __search(explorer: GraphExplorer, cached: dict[str, SearchResult], entry: DatasetEntry) -> Dict[str, Any]:
     """
-     Perform a search on the graph rag using the provided dataset entry.
+     Perform a search on the graph rag using the provided dataset entry, unless its result was cached.
+     The latency and token usage of the search are added as extra columns.
      """
-    console.print(f"[bold purple] Querying : {entry.query} ...[/bold purple]")
-    search_result = await explorer.search(entry.query, SearchType.LOCAL)
-    console.print(f"[green] Querying : {entry.query} ... OK ![/green]")
+    search_result = cached.get(entry.query)
+    if search_result is not None:
+        console.print(f"[green] Querying : {entry.query} ... cached ![/green]")
+        metrics = SearchMetrics.from_cached(SearchType.LOCAL.value, search_result)
+    else:
+        limiter = __search_limiter(explorer)
+        async with limiter:
+            console.print(f"[bold purple] Querying : {entry.query} ...[/bold purple]")
+            search_result, metrics = await explorer.instrumented_search(
+                entry.query, SearchType.LOCAL, use_cache=False)
+            console.print(f"[green] Querying : {entry.query} ... OK ![/green]")
 
     return {
         "query": json.dumps(entry.query),
         "ground_truth": json.dumps(entry.ground_truth),
         "response": json.dumps(search_result.response),
-        "context_text": json.dumps(search_result.context_text)
+        "context_text": json.dumps(search_result.context_text),
+        **metrics.to_dict()
     }
 
+
+def __search_limiter(explorer: GraphExplorer) -> AdaptiveLimiter:
+    """
+    Get the limiter shared by every search running against the explorer's chat deployment.
+    """
+    tokens_per_minute = explorer.model_config.tokens_per_minute
+    return limiter_for(
+        str(explorer.model_deployment_name),
+        tokens_per_minute=tokens_per_minute if isinstance(tokens_per_minute, int) else None,
+        **SEARCH_CONCURRENCY
+    )
+
+
 if __name__ == "__main__":
     asyncio.run(main())
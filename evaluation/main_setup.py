@@ -3,11 +3,15 @@ from pathlib import Path
 from app_config import settings
 from config import load_queries
 from config.model_factory import ModelFactory
-from graph_sdk import GraphExplorer
+from graph_sdk import EmbeddingCache, GraphExplorer, SearchResultCache
 from graphrag.config.enums import ModelType
 from utils import console
+from utils.concurrency import limiter_for
 from utils.json_utils import DatasetEntry
 
+# Start with 8 concurrent LLM calls per chat deployment in global searches, up to the 32 graphrag defaults to
+LLM_CONCURRENCY = {"initial_limit": 8, "max_limit": 32}
+
 
 def initialize() -> tuple[list[DatasetEntry], ModelFactory, list[GraphExplorer]]:
     # Initialize configuration and GraphRAG contexts
@@ -24,6 +28,14 @@ def initialize() -> tuple[list[DatasetEntry], ModelFactory, list[GraphExplorer]]
 def initialize_graph_explorers(model_factory: ModelFactory):
     graph_explorers: list[GraphExplorer] = []
 
+    # Results are keyed on the graph content and models, a single cache serves every explorer
+    result_cache = SearchResultCache(
+        root=Path(settings.search_cache.path),
+        max_bytes=settings.search_cache.max_size_mb * 1024 * 1024
+    )
+    # Query embeddings are keyed on the embedding deployment, shared by every explorer as well
+    embedding_cache = EmbeddingCache(Path(settings.embedding_cache.path))
+
     for model_name in model_factory.list_models(ModelType.AzureOpenAIChat):
 
         chat_model = model_factory.get(model_name, ModelType.AzureOpenAIChat)
@@ -38,10 +50,22 @@ def initialize_graph_explorers(model_factory: ModelFactory):
 
         graph_path = settings.evaluations[model_name].path
 
+        # Bounds the LLM calls of the global search map and reduce steps, apart from the limiter of the
+        # searches themselves: a search holding a slot must not wait for another one for its own calls
+        tokens_per_minute = chat_model.tokens_per_minute
+        llm_limiter = limiter_for(
+            str(chat_model.deployment_name), scope="llm",
+            tokens_per_minute=tokens_per_minute if isinstance(tokens_per_minute, int) else None,
+            **LLM_CONCURRENCY
+        )
+
         graph_explorer = GraphExplorer(
             graph_path=Path(graph_path),
             chat_config=chat_model,
-            embedding_config=embedding_model
+            embedding_config=embedding_model,
+            llm_limiter=llm_limiter,
+            result_cache=result_cache,
+            embedding_cache=embedding_cache
         )
 
         graph_explorers.append(graph_explorer)
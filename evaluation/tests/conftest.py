@@ -0,0 +1,24 @@
+import pytest
+
+from benchmarks.fake_models import (
+    FakeEmbeddingModel,
+    FakeModelProfile,
+    _FakeModel,
+    fake_model_configs,
+    register_fake_models,
+)
+
+
+@pytest.fixture
+def fake_models():
+    """Register instant fake models with small embeddings, restoring the default profile afterwards."""
+    profile = _FakeModel.profile
+    register_fake_models(FakeModelProfile(latency=0.0, jitter=0.0, output_tokens=20, dimensions=8))
+    yield
+    _FakeModel.profile = profile
+
+
+@pytest.fixture
+def embedding_model(fake_models) -> FakeEmbeddingModel:
+    _, embedding_config = fake_model_configs("test")
+    return FakeEmbeddingModel(name="test-embedding", config=embedding_config)
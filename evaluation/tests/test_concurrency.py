@@ -0,0 +1,199 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from fnllm.events import LLMEvents
+
+from graph_sdk.concurrency import AdaptiveLimiter, LimitedChatModel, _limiters, limiter_for, observe_llm_events
+from utils.concurrency import LimitedEvaluator
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+@pytest.fixture(autouse=True)
+def clear_limiters():
+    _limiters.clear()
+    yield
+    _limiters.clear()
+
+
+async def test_limit_grows_after_a_window_of_fast_calls():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, latency_tolerance=1e9)
+    for _ in range(2):
+        async with limiter:
+            pass
+    assert limiter.limit == 3
+
+
+async def test_limit_never_exceeds_max():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2, latency_tolerance=1e9)
+    for _ in range(10):
+        async with limiter:
+            pass
+    assert limiter.limit == 2
+
+
+def test_noisy_latency_without_overload_keeps_growing_the_limit():
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=32)
+    rng = random.Random(0)
+    limits = []
+    for _ in range(2000):
+        # LLM latencies often spread over more than twice the fastest call
+        limiter._record_latency(rng.lognormvariate(0, 1.0))
+        limits.append(limiter.limit)
+    assert min(limits[200:]) > 8
+    assert limiter.limit == 32
+
+
+def test_consistently_slower_calls_back_off_then_recover():
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    for _ in range(80):
+        limiter._record_latency(1.0)
+    for _ in range(8):
+        limiter._record_latency(4.0)
+    assert limiter.limit == 6
+
+    # The baseline rises again once the deployment stays slower
+    for _ in range(200):
+        limiter._record_latency(4.0)
+    assert limiter.limit == 8
+
+
+def test_latency_is_ignored_without_tolerance():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, latency_tolerance=None)
+    for latency in [1.0, 1.0, 100.0, 100.0, 100.0]:
+        limiter._record_latency(latency)
+    assert limiter.limit == 4
+
+
+async def test_rate_limit_error_halves_the_limit():
+    limiter = AdaptiveLimiter(initial_limit=8)
+    with pytest.raises(RateLimitError):
+        async with limiter:
+            raise RateLimitError()
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+async def test_record_throttled_halves_the_limit_down_to_min():
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1)
+    for _ in range(5):
+        limiter.record_throttled()
+    assert limiter.limit == 1
+
+
+async def test_calls_beyond_the_limit_wait():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    running, peak = 0, 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter:
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+
+
+async def test_token_budget_holds_new_calls():
+    limiter = AdaptiveLimiter(tokens_per_minute=100)
+    limiter.record_tokens(60)
+    assert limiter._token_budget_wait() == 0
+    limiter.record_tokens(60)
+    assert 0 < limiter._token_budget_wait() <= 60
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.__aenter__(), timeout=0.05)
+
+
+def test_limiter_for_shares_limiters_per_deployment_and_scope():
+    search = limiter_for("gpt", initial_limit=5)
+    assert limiter_for("gpt") is search
+    assert search.limit == 5
+    llm = limiter_for("gpt", scope="llm")
+    assert llm is not search
+    assert limiter_for("other") is not search
+
+
+async def test_observed_events_report_throttling_and_tokens_to_the_deployment_limiters():
+    events = LLMEvents()
+    # graphrag provider, wrapped by the instrumentation, wrapping the fnllm model
+    chat_model = SimpleNamespace(model=SimpleNamespace(model=SimpleNamespace(
+        _streaming_chat_llm=SimpleNamespace(events=events))))
+    search = limiter_for("gpt", initial_limit=8, tokens_per_minute=1000)
+    assert observe_llm_events(chat_model, "gpt")
+    assert observe_llm_events(chat_model, "gpt")
+    llm = limiter_for("gpt", scope="llm", initial_limit=8)
+    other = limiter_for("other", initial_limit=8)
+
+    await events.on_retryable_error(RateLimitError(), 1)
+    await events.on_retryable_error(TimeoutError(), 1)
+    await events.on_usage(SimpleNamespace(total_tokens=1200))
+
+    # Hooked once, although observed twice
+    assert (search.limit, llm.limit, other.limit) == (4, 4, 8)
+    assert search._token_budget_wait() > 0
+
+
+def test_models_without_fnllm_events_are_not_observed():
+    assert not observe_llm_events(SimpleNamespace(model=object()), "gpt")
+
+
+async def test_limited_chat_model_bounds_calls_and_streams():
+    running, peak = 0, 0
+
+    class Model:
+        async def achat(self, prompt, history=None, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return prompt
+
+        async def achat_stream(self, prompt, history=None, **kwargs):
+            for word in prompt.split():
+                yield word
+
+    model = LimitedChatModel(Model(), AdaptiveLimiter(initial_limit=1, max_limit=1))
+    assert await asyncio.gather(*(model.achat(str(i)) for i in range(4))) == ["0", "1", "2", "3"]
+    assert peak == 1
+    assert [chunk async for chunk in model.achat_stream("a b")] == ["a", "b"]
+    assert model.limiter.in_flight == 0
+
+
+def test_limited_evaluators_share_a_bound_on_judge_calls():
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    class Judge:
+        id = "azureai://built-in/evaluators/groundedness"
+
+        def __call__(self, *, query, response):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            return {"score": len(response)}
+
+    semaphore = threading.BoundedSemaphore(2)
+    evaluators = [LimitedEvaluator(Judge(), semaphore, inputs=["query", "response"]) for _ in range(3)]
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        # Every dataset column is passed along, only the mapped inputs reach the judge
+        results = list(executor.map(lambda i: evaluators[i % 3](query="q", response="r" * i, latency_s=1.0), range(12)))
+
+    assert [result["score"] for result in results] == list(range(12))
+    assert peak == 2
+    assert evaluators[0].id == Judge.id
+
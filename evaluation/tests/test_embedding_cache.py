@@ -0,0 +1,59 @@
+from graph_sdk.embedding_cache import CachedEmbedder, EmbeddingCache
+
+
+def test_vectors_round_trip_exactly_per_deployment(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.db")
+    vector = [0.1, 1 / 3, -2.5e-8]
+    cache.put_many("small", {"query": vector})
+
+    assert cache.get_many("small", ["query", "missing"]) == {"query": vector}
+    assert cache.get_many("large", ["query"]) == {}
+
+
+def test_lookups_of_many_texts(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.db")
+    embeddings = {f"text {i}": [float(i)] for i in range(1200)}
+    cache.put_many("small", embeddings)
+    assert cache.get_many("small", embeddings) == embeddings
+
+
+async def test_in_memory_embedder_embeds_a_text_once(embedding_model):
+    embedder = CachedEmbedder(embedding_model)
+
+    first = await embedder.aembed("query")
+    assert embedder.embed("query") == first
+    assert await embedder.aembed_batch(["query", "query"]) == [first, first]
+    assert embedding_model.calls == 1
+
+
+async def test_prefetch_embeds_in_batches_and_persists(tmp_path, embedding_model):
+    cache = EmbeddingCache(tmp_path / "embeddings.db")
+    texts = [f"query {i}" for i in range(40)]
+    await CachedEmbedder(embedding_model, cache, batch_size=16).prefetch(texts)
+    assert embedding_model.calls == 3
+
+    restarted = CachedEmbedder(embedding_model, cache)
+    assert await restarted.aembed_batch(texts) == [embedding_model._vector(text) for text in texts]
+    assert embedding_model.calls == 3
+
+
+async def test_least_recently_used_vectors_are_dropped_from_memory(embedding_model):
+    embedder = CachedEmbedder(embedding_model, max_entries=2)
+    await embedder.aembed("a")
+    await embedder.aembed("b")
+    await embedder.aembed("a")
+    await embedder.aembed("c")
+
+    assert list(embedder._vectors) == ["a", "c"]
+    await embedder.aembed("a")
+    assert embedding_model.calls == 3
+
+
+async def test_batches_larger_than_the_memory_are_returned_whole(tmp_path, embedding_model):
+    embedder = CachedEmbedder(embedding_model, EmbeddingCache(tmp_path / "embeddings.db"), max_entries=4)
+    texts = [f"query {i}" for i in range(10)]
+    expected = [embedding_model._vector(text) for text in texts]
+
+    assert await embedder.aembed_batch(texts) == expected
+    assert embedder.embed_batch(texts) == expected
+    assert len(embedder._vectors) == 4
@@ -0,0 +1,44 @@
+import os
+import shutil
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+SAMPLE_GRAPH = Path(__file__).parents[1] / "sample-gpt4" / "output"
+
+# Preloads a graph then searches its embedding stores from a forked process, as the MCP server workers do.
+# Runs in its own interpreter: LanceDB calls of other tests in the pytest process must not be inherited
+FORKED_SEARCH = textwrap.dedent("""
+    import os, sys
+    from pathlib import Path
+    from graph_sdk.graph_artifacts import ENTITY_DESCRIPTION_INDEX, GraphArtifacts
+    from graph_sdk.numpy_store import NumpyVectorStore
+
+    artifacts = GraphArtifacts(Path(sys.argv[1]))
+    artifacts.load_tables()
+    assert "description_embedding_store" not in artifacts.__dict__, "LanceDB was opened before forking"
+
+    pid = os.fork()
+    if pid == 0:
+        in_memory = artifacts.description_embedding_store
+        assert isinstance(in_memory, NumpyVectorStore)
+        GraphArtifacts.IN_MEMORY_STORE_MAX_ROWS = 0
+        lance = artifacts._vector_store(ENTITY_DESCRIPTION_INDEX)
+        query = in_memory.search_by_id(in_memory._ids[0]).vector
+        results = [store.similarity_search_by_vector(query, k=1)[0].document.id for store in (in_memory, lance)]
+        print(results, flush=True)
+        os._exit(0 if results == [in_memory._ids[0]] * 2 else 1)
+    _, status = os.waitpid(pid, 0)
+    sys.exit(os.waitstatus_to_exitcode(status))
+""")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Forking requires Linux or macOS")
+def test_embedding_stores_are_searchable_in_a_process_forked_after_preloading(tmp_path):
+    graph = shutil.copytree(SAMPLE_GRAPH, tmp_path / "output")
+    result = subprocess.run([sys.executable, "-c", FORKED_SEARCH, str(graph)], cwd=Path(__file__).parents[1],
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,86 @@
+import pytest
+from graphrag.data_model.text_unit import TextUnit
+
+from graph_sdk.arrow_store import ArrowRecordMap
+from graph_sdk.graph_snapshot import GraphSnapshot
+
+SOURCES = ["text_units.parquet"]
+
+
+def _text_units(count: int = 3) -> list[TextUnit]:
+    return [TextUnit(id=f"t{i}", short_id=str(i), text=f"text {i}", entity_ids=[f"e{i}"], n_tokens=i)
+            for i in range(count)]
+
+
+@pytest.fixture
+def graph(tmp_path):
+    path = tmp_path / "graphs" / "output"
+    path.mkdir(parents=True)
+    (path / "text_units.parquet").write_bytes(b"v1")
+    return path
+
+
+class Build:
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.calls = 0
+
+    def __call__(self) -> list:
+        self.calls += 1
+        return self.rows
+
+
+def test_converted_table_is_built_once(graph):
+    build = Build(_text_units())
+    assert GraphSnapshot(graph).load_or_build("text_units", TextUnit, SOURCES, build) == build.rows
+    assert GraphSnapshot(graph).load_or_build("text_units", TextUnit, SOURCES, build) == build.rows
+    assert build.calls == 1
+
+
+def test_changed_artifacts_replace_the_snapshot(graph):
+    GraphSnapshot(graph).load_or_build("text_units", TextUnit, SOURCES, Build(_text_units()))
+    (graph / "text_units.parquet").write_bytes(b"v2")
+    build = Build(_text_units(2))
+
+    assert GraphSnapshot(graph).load_or_build("text_units", TextUnit, SOURCES, build) == build.rows
+    assert build.calls == 1
+    assert len(list(GraphSnapshot(graph).root.iterdir())) == 1
+
+
+def test_graphs_sharing_a_folder_keep_their_own_snapshots(graph):
+    other = graph.parent / "other"
+    other.mkdir()
+    (other / "text_units.parquet").write_bytes(b"other")
+    GraphSnapshot(graph).load_or_build("text_units", TextUnit, SOURCES, Build(_text_units()))
+    GraphSnapshot(other).load_or_build("text_units", TextUnit, SOURCES, Build(_text_units(1)))
+
+    build = Build(_text_units())
+    GraphSnapshot(graph).load_or_build("text_units", TextUnit, SOURCES, build)
+    assert build.calls == 0
+    assert GraphSnapshot(graph).root != GraphSnapshot(other).root
+
+
+def test_snapshot_files_are_written_without_leftovers(graph):
+    snapshot = GraphSnapshot(graph)
+    snapshot.load_or_build("text_units", TextUnit, SOURCES, Build(_text_units()))
+    snapshot.load_or_build("text_units_by_id", TextUnit, SOURCES, Build(_text_units()))
+    assert sorted(file.suffix for file in snapshot.root.iterdir()) == [".arrow", ".arrow"]
+
+
+def test_unwritable_snapshot_keeps_the_table_in_memory(graph):
+    # A file in place of the snapshot folder
+    (graph.parent / "snapshot").write_bytes(b"")
+    table = GraphSnapshot(graph).load_table("text_units", SOURCES, Build(_text_units()))
+    assert table.num_rows == 3
+
+
+def test_arrow_record_map_reads_records_by_key(graph):
+    table = GraphSnapshot(graph).load_table("text_units", SOURCES, Build(_text_units()))
+    records = ArrowRecordMap(table, TextUnit)
+
+    assert len(records) == 3
+    assert list(records) == ["t0", "t1", "t2"]
+    assert records["t1"] == _text_units()[1]
+    assert "t3" not in records
+    with pytest.raises(KeyError):
+        records["t3"]
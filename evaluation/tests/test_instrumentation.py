@@ -0,0 +1,45 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from benchmarks.fake_models import FakeChatModel
+from graph_sdk import GraphContext, instrumentation
+from graph_sdk.instrumentation import InstrumentedChatModel, InstrumentedVectorStore, measure_search
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(instrumentation, "_tracer", provider.get_tracer("graph_sdk"))
+    return exporter
+
+
+async def test_search_is_emitted_as_a_span_with_a_child_per_stage(spans, fake_models):
+    model = InstrumentedChatModel(FakeChatModel(name="chat"))
+    with measure_search("local", "Who is Scrooge?") as metrics:
+        await model.achat("prompt")
+
+    llm, search = spans.get_finished_spans()
+    assert (search.name, llm.name) == ("graphrag.search", "graphrag.llm")
+    assert llm.parent.span_id == search.context.span_id
+    assert search.attributes["graphrag.query"] == "Who is Scrooge?"
+    assert search.attributes["graphrag.search_type"] == "local"
+    assert search.attributes["graphrag.llm_s"] == metrics.llm_s > 0
+
+
+def test_vector_stores_are_instrumented_once_per_context(tmp_path):
+    graph = shutil.copytree(Path(__file__).parents[1] / "sample-gpt4" / "output", tmp_path / "output")
+    # Only the graph is attached, the tokenizer of the models being downloaded on first use
+    context = GraphContext.__new__(GraphContext)
+    context.load_graph(graph)
+
+    store = context.description_embedding_store
+    assert isinstance(store, InstrumentedVectorStore)
+    assert context.description_embedding_store is store
+    assert context.full_content_embedding_store is context.full_content_embedding_store
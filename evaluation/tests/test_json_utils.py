@@ -0,0 +1,58 @@
+import json
+
+from utils.json_utils import JsonlDatasetWriter, load_written_queries
+
+
+def _row(query: str) -> dict:
+    return {"query": json.dumps(query), "response": json.dumps(f"answer to {query}")}
+
+
+def test_writer_buffers_until_the_batch_is_full(tmp_path):
+    dataset = tmp_path / "dataset.jsonl"
+    with JsonlDatasetWriter(dataset, batch_size=2) as writer:
+        writer.write(_row("a"))
+        assert dataset.read_text() == ""
+        writer.write(_row("b"))
+        assert len(dataset.read_text().splitlines()) == 2
+        writer.write(_row("c"))
+    assert load_written_queries(dataset) == {"a", "b", "c"}
+
+
+def test_writer_drops_a_partially_written_line(tmp_path):
+    dataset = tmp_path / "dataset.jsonl"
+    dataset.write_text(json.dumps(_row("a")) + "\n" + '{"query": "\\"b')
+    assert load_written_queries(dataset) == {"a"}
+
+    with JsonlDatasetWriter(dataset) as writer:
+        writer.write(_row("b"))
+    assert [json.loads(line) for line in dataset.read_text().splitlines()] == [_row("a"), _row("b")]
+
+
+def test_missing_dataset_has_no_written_queries(tmp_path):
+    assert load_written_queries(tmp_path / "missing.jsonl") == set()
+
+
+def test_only_queries_of_the_same_version_are_written(tmp_path):
+    dataset = tmp_path / "dataset.jsonl"
+    with JsonlDatasetWriter(dataset, version="v1") as writer:
+        writer.write(_row("a"))
+    with JsonlDatasetWriter(dataset, version="v1") as writer:
+        writer.write(_row("b"))
+
+    assert load_written_queries(dataset, version="v1") == {"a", "b"}
+    assert load_written_queries(dataset, version="v2") == set()
+
+
+def test_writer_drops_entries_of_other_versions(tmp_path):
+    dataset = tmp_path / "dataset.jsonl"
+    # Written before the entries were versioned, then by a previous graph index
+    dataset.write_text(json.dumps(_row("a")) + "\n")
+    with JsonlDatasetWriter(dataset, version="v1") as writer:
+        writer.write(_row("b"))
+    assert load_written_queries(dataset) == {"b"}
+
+    with JsonlDatasetWriter(dataset, version="v2") as writer:
+        writer.write(_row("c"))
+    rows = [json.loads(line) for line in dataset.read_text().splitlines()]
+    assert rows == [{**_row("c"), "search_version": "v2"}]
+    assert list(tmp_path.iterdir()) == [dataset]
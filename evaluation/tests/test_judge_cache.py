@@ -0,0 +1,46 @@
+from utils.judge_cache import CachedEvaluator, JudgeCache
+
+
+class Evaluator:
+    """Judge returning a fixed score, counting its calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, **inputs) -> dict:
+        self.calls.append(inputs)
+        return {"groundedness": 4, "groundedness_reason": "supported"}
+
+
+def _cached(tmp_path, evaluator, deployment: str = "judge") -> CachedEvaluator:
+    return CachedEvaluator(evaluator, JudgeCache(tmp_path / "judge.sqlite"), deployment,
+                           inputs=["query", "response"])
+
+
+def test_inputs_are_only_scored_once(tmp_path):
+    evaluator = Evaluator()
+    cached = _cached(tmp_path, evaluator)
+    expected = {"groundedness": 4, "groundedness_reason": "supported"}
+    assert cached(query="q", response="r", context="ignored") == expected
+    assert cached(query="q", response="r", context="changed") == expected
+    # The evaluator only receives its mapped inputs
+    assert evaluator.calls == [{"query": "q", "response": "r"}]
+
+
+def test_scores_persist_across_runs(tmp_path):
+    _cached(tmp_path, Evaluator())(query="q", response="r")
+    evaluator = Evaluator()
+    _cached(tmp_path, evaluator)(query="q", response="r")
+    assert evaluator.calls == []
+
+
+def test_changed_inputs_or_judge_are_scored_again(tmp_path):
+    evaluator = Evaluator()
+    _cached(tmp_path, evaluator)(query="q", response="r")
+    _cached(tmp_path, evaluator)(query="q", response="other")
+    _cached(tmp_path, evaluator, deployment="other-judge")(query="q", response="r")
+    assert len(evaluator.calls) == 3
+
+
+def test_missing_result_is_none(tmp_path):
+    assert JudgeCache(tmp_path / "nested" / "judge.sqlite").get("missing") is None
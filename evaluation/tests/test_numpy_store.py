@@ -0,0 +1,110 @@
+import json
+
+import lancedb
+import numpy as np
+import pyarrow as pa
+import pytest
+from graphrag.config.models.vector_store_schema_config import VectorStoreSchemaConfig
+from graphrag.vector_stores.lancedb import LanceDBVectorStore
+
+from graph_sdk.numpy_store import NumpyVectorStore
+
+TABLE = "default-entity-description"
+DIMENSIONS = 16
+
+
+@pytest.fixture
+def db_uri(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, DIMENSIONS)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    uri = str(tmp_path / "lancedb")
+    lancedb.connect(uri).create_table(TABLE, pa.table({
+        "id": [f"e{i}" for i in range(len(vectors))],
+        "text": [f"entity {i}" for i in range(len(vectors))],
+        "vector": pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), DIMENSIONS),
+        "attributes": [json.dumps({"title": f"entity {i}"}) for i in range(len(vectors))],
+    }))
+    return uri
+
+
+def _stores(db_uri: str, dtype: type = np.float32) -> tuple[LanceDBVectorStore, NumpyVectorStore]:
+    schema = VectorStoreSchemaConfig(index_name=TABLE)
+    lance = LanceDBVectorStore(vector_store_schema_config=schema)
+    lance.connect(db_uri=db_uri)
+    in_memory = NumpyVectorStore(schema, dtype=dtype)
+    in_memory.connect(db_uri=db_uri)
+    return lance, in_memory
+
+
+def _queries(count: int = 10) -> np.ndarray:
+    return np.random.default_rng(1).standard_normal((count, DIMENSIONS)).astype(np.float32)
+
+
+def test_ranking_and_scores_match_lancedb(db_uri):
+    lance, in_memory = _stores(db_uri)
+    for query in _queries():
+        expected = lance.similarity_search_by_vector(query.tolist(), k=10)
+        results = in_memory.similarity_search_by_vector(query, k=10)
+        assert [r.document.id for r in results] == [r.document.id for r in expected]
+        assert [r.score for r in results] == pytest.approx([r.score for r in expected], abs=1e-4)
+        assert results[0].document.attributes == expected[0].document.attributes
+
+
+def test_filtered_ranking_matches_lancedb(db_uri):
+    lance, in_memory = _stores(db_uri)
+    included = [f"e{i}" for i in range(0, 200, 3)]
+    lance.filter_by_id(included)
+    in_memory.filter_by_id(included)
+    query = _queries(1)[0]
+
+    expected = [r.document.id for r in lance.similarity_search_by_vector(query.tolist(), k=5)]
+    assert [r.document.id for r in in_memory.similarity_search_by_vector(query, k=5)] == expected
+    in_memory.filter_by_id([])
+    assert len(in_memory.similarity_search_by_vector(query, k=100)) == 100
+
+
+def test_half_precision_keeps_the_ranking(db_uri):
+    _, in_memory = _stores(db_uri)
+    _, half = _stores(db_uri, dtype=np.float16)
+    for query in _queries():
+        assert ([r.document.id for r in half.similarity_search_by_vector(query, k=5)]
+                == [r.document.id for r in in_memory.similarity_search_by_vector(query, k=5)])
+
+
+def test_primed_searches_are_served_once_per_priming(db_uri):
+    _, in_memory = _stores(db_uri)
+    queries = _queries(3)
+    expected = [in_memory.similarity_search_by_vector(query, k=5) for query in queries]
+    in_memory.prime(queries, k=10)
+    in_memory.prime(queries[:1], k=10)
+
+    assert [r.document.id for r in in_memory.similarity_search_by_vector(queries[0], k=5)] == \
+        [r.document.id for r in expected[0]]
+    assert len(in_memory._primed) == 3
+    in_memory.similarity_search_by_vector(queries[0], k=5)
+    in_memory.similarity_search_by_vector(queries[1], k=5)
+    assert list(in_memory._primed) == [queries[2].tobytes()]
+
+
+def test_search_by_id(db_uri):
+    _, in_memory = _stores(db_uri)
+    document = in_memory.search_by_id("e3")
+    assert (document.text, len(document.vector)) == ("entity 3", DIMENSIONS)
+    assert in_memory.search_by_id("missing").vector is None
+
+
+def test_primed_searches_never_served_are_cleared_once_every_priming_is_over(db_uri):
+    _, in_memory = _stores(db_uri)
+    queries = _queries(3)
+    # Two explorers of the same graph prime their queries, then the search of the first query fails
+    in_memory.prime(queries[:2], k=10)
+    in_memory.prime(queries[1:], k=10)
+    in_memory.similarity_search_by_vector(queries[1], k=5)
+
+    in_memory.clear_primed()
+    assert len(in_memory._primed) == 3
+    in_memory.clear_primed()
+    assert in_memory._primed == {}
+    in_memory.clear_primed()
+    assert len(in_memory.similarity_search_by_vector(queries[0], k=5)) == 5
@@ -0,0 +1,64 @@
+import os
+
+from graphrag.query.structured_search.base import SearchResult
+
+from graph_sdk.result_cache import SearchResultCache
+
+
+def _result(response: str) -> SearchResult:
+    return SearchResult(response=response, context_data={}, context_text="context", completion_time=0.0,
+                        llm_calls=1, prompt_tokens=10, output_tokens=5)
+
+
+def _size(cache: SearchResultCache) -> int:
+    return sum(file.stat().st_size for file in cache.root.glob("*/*.pkl"))
+
+
+def test_key_depends_on_every_field():
+    key = SearchResultCache.key(query="q", type="local", graph="h")
+    assert key == SearchResultCache.key(type="local", graph="h", query="q")
+    assert key != SearchResultCache.key(query="q", type="local", graph="h2")
+
+
+def test_results_round_trip(tmp_path):
+    cache = SearchResultCache(tmp_path)
+    key = SearchResultCache.key(query="q")
+    assert cache.get(key) is None
+    cache.put(key, _result("a"))
+    assert cache.get(key).response == "a"
+    assert SearchResultCache(tmp_path).get(key).response == "a"
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    keys = [SearchResultCache.key(query=str(i)) for i in range(3)]
+    cache = SearchResultCache(tmp_path)
+    cache.put(keys[0], _result("0"))
+    cache.max_bytes = 2 * _size(cache)
+    cache.put(keys[1], _result("1"))
+    cache.get(keys[0])
+    cache.put(keys[2], _result("2"))
+
+    assert [cache.get(key) is not None for key in keys] == [True, False, True]
+    assert _size(cache) <= cache.max_bytes
+
+
+def test_index_is_rebuilt_from_the_cache_folder(tmp_path):
+    keys = [SearchResultCache.key(query=str(i)) for i in range(3)]
+    cache = SearchResultCache(tmp_path)
+    for i, key in enumerate(keys):
+        cache.put(key, _result(str(i)))
+        # Oldest access first, whatever the resolution of the file system clock
+        os.utime(cache._path(key), (i, i))
+
+    restarted = SearchResultCache(tmp_path, max_bytes=_size(cache) * 2 // 3)
+    restarted.put(keys[1], _result("1"))
+    assert [restarted.get(key) is not None for key in keys] == [False, True, True]
+
+
+def test_clear_drops_every_result(tmp_path):
+    cache = SearchResultCache(tmp_path)
+    key = SearchResultCache.key(query="q")
+    cache.put(key, _result("a"))
+    cache.clear()
+    assert cache.get(key) is None
+    assert cache._size == 0
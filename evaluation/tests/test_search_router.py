@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from graphrag.config.models.vector_store_schema_config import VectorStoreSchemaConfig
+from graphrag.vector_stores.base import VectorStoreDocument
+
+from graph_sdk.numpy_store import NumpyVectorStore
+from graph_sdk.search_builder import SearchType
+from graph_sdk.search_router import SearchRouter
+
+ENTITY = [1.0, 0.0, 0.0]
+REPORT = [0.0, 1.0, 0.0]
+
+
+class Embedder:
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+        self.calls = 0
+
+    async def aembed(self, text: str) -> list[float]:
+        self.calls += 1
+        return self.vectors[text]
+
+
+def _store(name: str, vector: list[float]) -> NumpyVectorStore:
+    store = NumpyVectorStore(VectorStoreSchemaConfig(index_name=name))
+    store.load_documents([VectorStoreDocument(id=name, text=name, vector=vector, attributes={})])
+    return store
+
+
+@pytest.fixture
+def router():
+    embedder = Embedder({
+        "Who is Scrooge?": [0.9, 0.1, 0.0],
+        "What happens in the story?": [0.1, 0.9, 0.0],
+        "What are the main themes?": [0.4, 0.35, 0.85],
+        "What are the main themes of Scrooge?": [0.9, 0.2, 0.0],
+    })
+    ctx = SimpleNamespace(text_embedder=embedder, description_embedding_store=_store("entity", ENTITY),
+                          full_content_embedding_store=_store("report", REPORT))
+    return SearchRouter(ctx)  # type: ignore[arg-type]
+
+
+async def test_entity_query_goes_to_local_search(router):
+    decision = await router.route("Who is Scrooge?")
+    assert decision.type == SearchType.LOCAL
+    assert decision.entity_similarity == pytest.approx(0.9 / np.hypot(0.9, 0.1))
+
+
+async def test_query_closer_to_a_report_goes_to_global_search(router):
+    decision = await router.route("What happens in the story?")
+    assert decision.type == SearchType.GLOBAL
+    assert not decision.thematic
+
+
+async def test_thematic_query_matching_no_entity_goes_to_global_search(router):
+    decision = await router.route("What are the main themes?")
+    assert decision.thematic
+    assert decision.entity_similarity < SearchRouter.ENTITY_MATCH
+    assert decision.type == SearchType.GLOBAL
+
+
+async def test_thematic_query_about_an_entity_stays_local(router):
+    decision = await router.route("What are the main themes of Scrooge?")
+    assert decision.thematic
+    assert decision.type == SearchType.LOCAL
+
+
+async def test_empty_query_is_not_embedded(router):
+    assert (await router.route("  ")).type == SearchType.LOCAL
+    assert router._ctx.text_embedder.calls == 0
@@ -0,0 +1,67 @@
+import numpy as np
+from graphrag.query.structured_search.base import SearchResult
+
+from graph_sdk.semantic_cache import SemanticCache
+
+SCOPE = ("/graphs/a", "local", "chat")
+
+
+def _result(response: str) -> SearchResult:
+    return SearchResult(response=response, context_data={}, context_text="", completion_time=0.0,
+                        llm_calls=1, prompt_tokens=1, output_tokens=1)
+
+
+def _vector(*values: float) -> list[float]:
+    return list(values)
+
+
+def test_similar_query_is_served_the_cached_result():
+    cache = SemanticCache(threshold=0.95)
+    cache.put(SCOPE, "v1", _vector(1, 0, 0), _result("a"))
+    cache.put(SCOPE, "v1", _vector(0, 1, 0), _result("b"))
+
+    assert cache.get(SCOPE, "v1", _vector(2, 0.1, 0)).response == "a"
+    assert cache.get(SCOPE, "v1", _vector(0, 0, 1)) is None
+
+
+def test_results_are_scoped_and_versioned():
+    cache = SemanticCache()
+    cache.put(SCOPE, "v1", _vector(1, 0), _result("a"))
+
+    assert cache.get(("/graphs/b", "local", "chat"), "v1", _vector(1, 0)) is None
+    assert cache.get(SCOPE, "v2", _vector(1, 0)) is None
+    cache.put(SCOPE, "v2", _vector(0, 1), _result("b"))
+    assert cache.get(SCOPE, "v2", _vector(1, 0)) is None
+    assert cache.get(SCOPE, "v2", _vector(0, 1)).response == "b"
+
+
+def test_oldest_results_are_overwritten_past_max_entries():
+    cache = SemanticCache(threshold=0.99, max_entries=3)
+    vectors = np.eye(5).tolist()
+    for i, vector in enumerate(vectors):
+        cache.put(SCOPE, "v1", vector, _result(str(i)))
+
+    assert [cache.get(SCOPE, "v1", vector) for vector in vectors[:2]] == [None, None]
+    assert [cache.get(SCOPE, "v1", vector).response for vector in vectors[2:]] == ["2", "3", "4"]
+    assert len(cache._scopes[SCOPE].embeddings) == 3
+
+
+def test_embeddings_buffer_grows_until_max_entries():
+    cache = SemanticCache(threshold=0.99, max_entries=100)
+    vectors = np.eye(70).tolist()
+    for i, vector in enumerate(vectors):
+        cache.put(SCOPE, "v1", vector, _result(str(i)))
+
+    assert len(cache._scopes[SCOPE].embeddings) == 100
+    assert all(cache.get(SCOPE, "v1", vector).response == str(i) for i, vector in enumerate(vectors))
+
+
+def test_invalidate_drops_the_scopes_of_a_graph(tmp_path):
+    cache = SemanticCache()
+    scope = (str(tmp_path.resolve()), "local", "chat")
+    cache.put(scope, "v1", _vector(1, 0), _result("a"))
+    cache.put(SCOPE, "v1", _vector(1, 0), _result("b"))
+
+    cache.invalidate(tmp_path)
+    assert cache.get(scope, "v1", _vector(1, 0)) is None
+    assert cache.get(SCOPE, "v1", _vector(1, 0)).response == "b"
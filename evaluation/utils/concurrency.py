@@ -1,12 +1,36 @@
-import asyncio
-from functools import wraps
-
-
-def limit_concurrency(semaphore: asyncio.Semaphore):
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            async with semaphore:
-                return await func(*args, **kwargs)
-        return wrapper
-    return decorator
+from threading import BoundedSemaphore
+from typing import Any, Callable, Iterable
+
+# The adaptive limiter is shared with the search builders, it lives in graph_sdk
+from graph_sdk.concurrency import AdaptiveLimiter, limiter_for
+
+__all__ = ["AdaptiveLimiter", "LimitedEvaluator", "limiter_for"]
+
+
+class LimitedEvaluator:
+    """Evaluator wrapper bounding the calls in flight across every evaluation run sharing its semaphore.
+
+    Each evaluation run calls its evaluators from its own worker threads, so bounding the runs
+    alone does not bound the calls to the judge model.
+    """
+
+    def __init__(self, evaluator: Callable[..., dict], semaphore: BoundedSemaphore, inputs: Iterable[str]):
+        """Wrap an evaluator.
+
+        Args:
+            evaluator: Evaluator calling the judge model
+            semaphore: Semaphore shared by the evaluators of every evaluation run
+            inputs: Names of the evaluator inputs, as mapped from the dataset columns
+        """
+        self.evaluator = evaluator
+        self.semaphore = semaphore
+        self.inputs = tuple(inputs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.evaluator, name)
+
+    def __call__(self, **kwargs: Any) -> dict:
+        # The evaluation run passes every dataset column along, only keep the mapped inputs
+        inputs = {name: kwargs[name] for name in self.inputs if name in kwargs}
+        with self.semaphore:
+            return self.evaluator(**inputs)
@@ -1,5 +1,7 @@
 """JSON utilities for loading and parsing data files."""
 import json
+import os
+import tempfile
 from pathlib import Path
 
 
@@ -57,3 +59,119 @@ def load_jsonl_queries(file_path: str | Path) -> list[DatasetEntry] | None:
         pass
 
     return entries
+
+
+class JsonlDatasetWriter:
+    """Append entries to a JSONL dataset as they are produced, flushing them in batches.
+
+    Entries already written survive a crash of the run, and a partially written
+    trailing line left by an interrupted run is dropped before appending.
+    When a version is given, each entry is stamped with it and the entries of
+    other versions (another graph index, model or search parameters) are dropped.
+    """
+
+    def __init__(self, file_path: str | Path, batch_size: int = 10, version: str | None = None):
+        """Initialize the writer.
+
+        Args:
+            file_path: Path to the JSONL file, created if missing
+            batch_size: Number of entries buffered before they are written to disk
+            version: Version of the search producing the entries, stored in their `search_version` field
+        """
+        self.file_path = Path(file_path)
+        self.batch_size = batch_size
+        self.version = version
+        self._buffer: list[dict] = []
+        self._file = None
+
+    def __enter__(self) -> "JsonlDatasetWriter":
+        _drop_partial_line(self.file_path)
+        if self.version is not None:
+            _drop_other_versions(self.file_path, self.version)
+        self._file = self.file_path.open("a", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def write(self, entry: dict) -> None:
+        """Buffer an entry, writing the buffer to disk once it is full."""
+        if self.version is not None:
+            entry = {**entry, "search_version": self.version}
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every buffered entry to disk."""
+        if self._file is None or not self._buffer:
+            return
+        self._file.writelines(f"{json.dumps(entry)}\n" for entry in self._buffer)
+        self._file.flush()
+        self._buffer.clear()
+
+
+def load_written_queries(file_path: str | Path, version: str | None = None) -> set[str]:
+    """Load the queries already present in a generated dataset.
+
+    Generated datasets store each field JSON-encoded, so queries are decoded back
+    to compare them with the original dataset entries.
+
+    Args:
+        file_path: Path to the generated JSONL dataset
+        version: Only load the queries answered by this version of the search, see JsonlDatasetWriter
+
+    Returns:
+        Set of queries already answered, empty if the file does not exist
+    """
+    queries: set[str] = set()
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    if version is not None and entry.get("search_version") != version:
+                        continue
+                    queries.add(json.loads(entry["query"]))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # Partially written or invalid line, its query will be run again
+                    continue
+    except FileNotFoundError:
+        pass
+
+    return queries
+
+
+def _drop_partial_line(file_path: Path) -> None:
+    """Truncate a JSONL file after its last complete line."""
+    if not file_path.exists():
+        return
+    with file_path.open("rb+") as f:
+        content = f.read()
+        if content and not content.endswith(b"\n"):
+            f.truncate(content.rfind(b"\n") + 1)
+
+
+def _drop_other_versions(file_path: Path, version: str) -> None:
+    """Rewrite a JSONL dataset without the entries written by another version of the search."""
+    if not file_path.exists():
+        return
+    with file_path.open("r", encoding="utf-8") as f:
+        lines = f.readlines()
+    kept = [line for line in lines if _entry_version(line) == version]
+    if len(kept) == len(lines):
+        return
+    # Replaced atomically, an interruption leaves either the previous or the filtered dataset
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=file_path.parent, delete=False) as f:
+        f.writelines(kept)
+    os.replace(f.name, file_path)
+
+
+def _entry_version(line: str) -> str | None:
+    try:
+        return json.loads(line).get("search_version")
+    except (json.JSONDecodeError, AttributeError):
+        return None
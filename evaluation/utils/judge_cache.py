@@ -0,0 +1,91 @@
+"""Persistent cache of judge model scores for local evaluators."""
+import json
+import sqlite3
+from hashlib import sha256
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Iterable
+
+
+class JudgeCache:
+    """SQLite store of evaluator results, keyed by evaluator, judge deployment and inputs."""
+
+    def __init__(self, path: Path):
+        """Open the cache, creating its database if needed.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT)")
+        self._db.commit()
+
+    def get(self, key: str) -> dict | None:
+        """Get a stored evaluator result, None if it was never stored."""
+        with self._lock:
+            row = self._db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, result: dict) -> None:
+        """Store an evaluator result."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?)", (key, json.dumps(result)))
+            self._db.commit()
+
+
+class CachedEvaluator:
+    """Evaluator wrapper only calling the judge model for inputs it never scored.
+
+    Results are keyed on the evaluator name and version, the judge deployment and a hash
+    of the mapped inputs (e.g. query, context and response), so unchanged rows of a dataset
+    are scored from the cache on every later run.
+    """
+
+    def __init__(self, evaluator: Callable[..., dict], cache: JudgeCache, judge_deployment: str,
+                 inputs: Iterable[str], name: str | None = None):
+        """Wrap an evaluator.
+
+        Args:
+            evaluator: Evaluator to call on cache misses
+            cache: Store of the evaluator results
+            judge_deployment: Deployment of the judge model used by the evaluator
+            inputs: Names of the evaluator inputs, as mapped from the dataset columns
+            name: Evaluator name, defaults to its class name
+        """
+        self.evaluator = evaluator
+        self.inputs = tuple(inputs)
+        self.cache = cache
+        self.judge_deployment = judge_deployment
+        self.name = name or type(evaluator).__name__
+        # Built-in evaluators carry an id, their behavior changes with the SDK version
+        self.version = f"{getattr(evaluator, 'id', self.name)}@{_sdk_version()}"
+
+    def __call__(self, **kwargs: Any) -> dict:
+        # The evaluation run passes every dataset column along, only keep the mapped inputs
+        inputs = {name: kwargs[name] for name in self.inputs if name in kwargs}
+        key = self._key(inputs)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.evaluator(**inputs)
+            self.cache.put(key, result)
+        return result
+
+    def _key(self, inputs: dict[str, Any]) -> str:
+        payload = json.dumps({
+            "evaluator": self.name,
+            "version": self.version,
+            "judge_deployment": self.judge_deployment,
+            "inputs": inputs,
+        }, sort_keys=True, default=str)
+        return sha256(payload.encode()).hexdigest()
+
+
+def _sdk_version() -> str:
+    try:
+        return version("azure-ai-evaluation")
+    except PackageNotFoundError:
+        return "unknown"
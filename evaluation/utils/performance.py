@@ -0,0 +1,64 @@
+"""Latency, usage and cost metrics of the searches recorded in a generated dataset."""
+import json
+import statistics
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """Price of a chat deployment, in USD per million tokens."""
+
+    input: float
+    output: float
+
+    def cost(self, prompt_tokens: float, output_tokens: float) -> float:
+        """Cost of the given token usage, in USD."""
+        return (prompt_tokens * self.input + output_tokens * self.output) / 1_000_000
+
+
+def performance_metrics(dataset: Path, pricing: ModelPricing | None = None) -> dict[str, float]:
+    """Aggregate the search latency and LLM usage columns of a generated dataset.
+
+    Latency percentiles only cover the searches actually run, results read from the search cache
+    would otherwise drag them towards zero. Usage and cost cover every row, cached results are
+    counted with the usage they cost when they were computed.
+
+    Args:
+        dataset: Path to the JSONL dataset, with the columns written from the search metrics
+        pricing: Price of the chat deployment, the cost metrics are skipped without it
+
+    Returns:
+        Metrics prefixed with "performance.", empty if the dataset carries no search metrics
+    """
+    with open(dataset, "r", encoding="utf-8") as f:
+        rows = [row for row in map(json.loads, filter(str.strip, f)) if "latency_s" in row]
+    if not rows:
+        return {}
+
+    metrics = {
+        "performance.queries": len(rows),
+        "performance.cached_ratio": sum(bool(row.get("cached")) for row in rows) / len(rows),
+        "performance.llm_calls_per_query": statistics.mean(row["llm_calls"] for row in rows),
+        "performance.prompt_tokens_per_query": statistics.mean(row["prompt_tokens"] for row in rows),
+        "performance.output_tokens_per_query": statistics.mean(row["output_tokens"] for row in rows),
+    }
+    metrics["performance.tokens_per_query"] = (
+        metrics["performance.prompt_tokens_per_query"] + metrics["performance.output_tokens_per_query"])
+
+    latencies = [row["latency_s"] for row in rows if not row.get("cached")]
+    for percentile in (50, 95, 99):
+        if latencies:
+            metrics[f"performance.latency_p{percentile}_s"] = _percentile(latencies, percentile)
+
+    if pricing is not None:
+        metrics["performance.cost_per_query_usd"] = pricing.cost(
+            metrics["performance.prompt_tokens_per_query"], metrics["performance.output_tokens_per_query"])
+        metrics["performance.cost_usd"] = metrics["performance.cost_per_query_usd"] * len(rows)
+    return metrics
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
@@ -127,6 +127,37 @@ class PrettyConsole:
             )
         )
 
+    def print_metrics_comparison(self, title: str, metrics_by_variant: dict[str, dict]):
+        """Print the metrics of several evaluations side by side.
+
+        Args:
+            title: The title to display for the comparison table
+            metrics_by_variant: The evaluation metrics, keyed by variant name
+        """
+        self.console.print()
+
+        table = Table(
+            title=f"[bold cyan]📊 {title}[/bold cyan]",
+            show_header=True,
+            header_style="bold magenta",
+        )
+        table.add_column("Metric", style="yellow", justify="left")
+        for variant in metrics_by_variant:
+            table.add_column(variant, style="bright_green", justify="right")
+
+        # Keep the metric order of the evaluations, scores first then performance
+        metric_names = dict.fromkeys(
+            name for metrics in metrics_by_variant.values() for name in metrics)
+        for name in metric_names:
+            values = [metrics.get(name) for metrics in metrics_by_variant.values()]
+            table.add_row(
+                name,
+                *("N/A" if value is None else f"{value:.4g}" if isinstance(value, float) else str(value)
+                  for value in values),
+            )
+
+        self.console.print(table)
+
     def print(self, *args, **kwargs):
         """Wrapper for console.print to allow direct printing.
 
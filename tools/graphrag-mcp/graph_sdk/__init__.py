@@ -1,15 +1,34 @@
 """Graphrag SDK with different search strategies."""
 
+from .ann_index import AnnSearch
+from .embedding_cache import CachedEmbedder, EmbeddingCache
+from .graph_artifacts import GraphArtifacts, GraphRegistry
 from .graph_context import GraphContext
 from .graph_explorer import GraphExplorer, SearchResult
+from .instrumentation import SearchMetrics
+from .numpy_store import NumpyVectorStore
+from .result_cache import SearchResultCache
 from .search_builder import Drift, Global, Local, SearchType
+from .search_router import RoutingDecision, SearchRouter
+from .semantic_cache import SemanticCache
 
 __all__ = [
+    "AnnSearch",
+    "CachedEmbedder",
+    "EmbeddingCache",
+    "GraphArtifacts",
+    "GraphRegistry",
     "GraphContext",
     "Local",
     "Global",
     "Drift",
     "SearchType",
+    "SearchRouter",
+    "RoutingDecision",
     "GraphExplorer",
     "SearchResult",
+    "SearchMetrics",
+    "NumpyVectorStore",
+    "SearchResultCache",
+    "SemanticCache",
 ]
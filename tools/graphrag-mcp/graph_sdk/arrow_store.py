@@ -0,0 +1,52 @@
+import json
+from dataclasses import asdict
+from typing import Any, Generic, Iterator, Mapping, TypeVar
+
+import pyarrow as pa
+
+T = TypeVar("T")
+
+
+class ArrowRecordMap(Mapping[str, T], Generic[T]):
+    """Read-only mapping from a key to graphrag objects, backed by an Arrow table.
+
+    Rows are only converted to Python objects when looked up. When the table is
+    memory-mapped from a snapshot file, its buffers live in the OS page cache and are
+    shared by every process reading the same graph, forked workers included.
+    """
+
+    def __init__(self, table: pa.Table, data_type: type[T], key: str = "id") -> None:
+        self._table = table
+        self._data_type = data_type
+        self._index = {
+            value: i for i, value in enumerate(table.column(key).to_pylist())
+        } if table.num_rows else {}
+
+    def __getitem__(self, key: str) -> T:
+        row = self._table.slice(self._index[key], 1).to_pylist()[0]
+        return from_row(row, self._data_type)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+def to_row(record: Any) -> dict[str, Any]:
+    """Convert a graphrag dataclass to an Arrow-friendly row."""
+    row = asdict(record)
+    # Free-form attributes do not share a schema across rows
+    if row.get("attributes") is not None:
+        row["attributes"] = json.dumps(row["attributes"])
+    return row
+
+
+def from_row(row: dict[str, Any], data_type: type[T]) -> T:
+    """Convert a row produced by `to_row` back to its graphrag dataclass."""
+    if row.get("attributes") is not None:
+        row["attributes"] = json.loads(row["attributes"])
+    return data_type(**row)
@@ -0,0 +1,145 @@
+import sqlite3
+from array import array
+from collections import OrderedDict
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable, Sequence, TypeVar
+
+from graphrag.config.models.language_model_config import LanguageModelConfig
+from graphrag.language_model.protocol.base import EmbeddingModel
+
+T = TypeVar("T")
+
+
+class EmbeddingCache:
+    """On-disk store of text embeddings, keyed by embedding deployment and text.
+
+    Vectors are stored as float64 blobs in a SQLite database, so they round-trip exactly
+    and the store can be shared by every explorer and run using the same deployment.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+        self._db.commit()
+
+    def get_many(self, deployment: str, texts: Iterable[str]) -> dict[str, list[float]]:
+        """Get the stored embeddings of the texts, skipping the ones never stored."""
+        keys = {self._key(deployment, text): text for text in texts}
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            # Stay under the SQLite limit of variables per statement
+            for chunk in _batched(list(keys), 500):
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                for key, vector in rows:
+                    found[keys[key]] = array("d", vector).tolist()
+        return found
+
+    def put_many(self, deployment: str, embeddings: dict[str, list[float]]) -> None:
+        """Store the embeddings of the texts."""
+        rows = [(self._key(deployment, text), array("d", vector).tobytes())
+                for text, vector in embeddings.items()]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?)", rows)
+            self._db.commit()
+
+    @staticmethod
+    def _key(deployment: str, text: str) -> str:
+        return sha256(f"{deployment}\n{text}".encode()).hexdigest()
+
+
+class CachedEmbedder:
+    """Embedding model memoizing the vectors of the wrapped model, in memory and in an EmbeddingCache if set.
+
+    Texts missing from the cache are embedded with bulk calls of `batch_size` texts, so a
+    whole dataset of queries can be prefetched before searching and search-time lookups
+    never wait on the embedding deployment. Without an EmbeddingCache, vectors are only
+    kept in memory, so the steps of a search embedding the same query share a single call.
+    Past `max_entries` vectors in memory, the least recently used ones are dropped, to be read
+    back from the EmbeddingCache or embedded again.
+    """
+
+    def __init__(self, model: EmbeddingModel, cache: EmbeddingCache | None = None, batch_size: int = 16,
+                 max_entries: int = 4096) -> None:
+        self.model = model
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self._vectors: OrderedDict[str, list[float]] = OrderedDict()
+
+    @property
+    def config(self) -> LanguageModelConfig:
+        return self.model.config
+
+    @property
+    def deployment(self) -> str:
+        return str(self.config.deployment_name)
+
+    async def prefetch(self, texts: Iterable[str]) -> None:
+        """Embed the texts missing from the cache ahead of the searches."""
+        await self.aembed_batch(list(texts))
+
+    async def aembed_batch(self, text_list: list[str], **kwargs: Any) -> list[list[float]]:
+        vectors = self._cached(text_list)
+        for batch in self._missing_batches(text_list, vectors):
+            vectors.update(self._store(batch, await self.model.aembed_batch(batch, **kwargs)))
+        return [vectors[text] for text in text_list]
+
+    async def aembed(self, text: str, **kwargs: Any) -> list[float]:
+        return (await self.aembed_batch([text], **kwargs))[0]
+
+    def embed_batch(self, text_list: list[str], **kwargs: Any) -> list[list[float]]:
+        vectors = self._cached(text_list)
+        for batch in self._missing_batches(text_list, vectors):
+            vectors.update(self._store(batch, self.model.embed_batch(batch, **kwargs)))
+        return [vectors[text] for text in text_list]
+
+    def embed(self, text: str, **kwargs: Any) -> list[float]:
+        return self.embed_batch([text], **kwargs)[0]
+
+    def _cached(self, texts: list[str]) -> dict[str, list[float]]:
+        """Get the vectors of the texts in memory, then the ones stored on disk.
+
+        The batch keeps its own mapping, vectors of large batches being dropped from memory meanwhile.
+        """
+        found = {}
+        for text in dict.fromkeys(texts):
+            if text in self._vectors:
+                self._vectors.move_to_end(text)
+                found[text] = self._vectors[text]
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        if missing and self.cache is not None:
+            stored = self.cache.get_many(self.deployment, missing)
+            self._remember(stored)
+            found.update(stored)
+        return found
+
+    def _missing_batches(self, texts: list[str], found: dict[str, list[float]]) -> list[list[str]]:
+        """Split the texts left to embed into batches."""
+        missing = [text for text in dict.fromkeys(texts) if text not in found]
+        return [list(batch) for batch in _batched(missing, self.batch_size)]
+
+    def _store(self, texts: list[str], vectors: list[list[float]]) -> dict[str, list[float]]:
+        embeddings = dict(zip(texts, vectors))
+        self._remember(embeddings)
+        if self.cache is not None:
+            self.cache.put_many(self.deployment, embeddings)
+        return embeddings
+
+    def _remember(self, embeddings: dict[str, list[float]]) -> None:
+        """Keep vectors in memory, dropping the least recently used ones past `max_entries`."""
+        self._vectors.update(embeddings)
+        for text in embeddings:
+            self._vectors.move_to_end(text)
+        while len(self._vectors) > self.max_entries:
+            self._vectors.popitem(last=False)
+
+
+def _batched(items: Sequence[T], size: int) -> Iterable[Sequence[T]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
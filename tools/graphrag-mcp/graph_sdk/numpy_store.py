@@ -0,0 +1,204 @@
+import json
+from typing import Any
+
+import lancedb
+import numpy as np
+from graphrag.config.models.vector_store_schema_config import VectorStoreSchemaConfig
+from graphrag.data_model.types import TextEmbedder
+from graphrag.vector_stores.base import BaseVectorStore, VectorStoreDocument, VectorStoreSearchResult
+
+# Rows scored at once when the matrix is stored in half precision, NumPy having no float16 BLAS kernels
+_HALF_PRECISION_BLOCK = 4096
+# Queries primed at once
+_PRIME_BLOCK = 1024
+
+
+class NumpyVectorStore(BaseVectorStore):
+    """In-memory vector store, searching a contiguous NumPy matrix of the embeddings.
+
+    The documents of a LanceDB table are read once on `connect`, then each similarity search is a
+    single matrix-vector product followed by an `argpartition` top-k, without the per-query overhead
+    of a LanceDB scan. Scores and ranking match LanceDBVectorStore: 1 - squared L2 distance.
+    Storing the matrix in float16 halves its memory, rows are then scored in float32 blocks.
+
+    Searches of known queries can be primed in bulk: `prime` runs them all in one matrix product,
+    then an unfiltered search for one of these exact embeddings is served from the primed results.
+    Primed results are released once served as many times as they were primed, and those never served
+    (e.g. of failed searches) once every priming is cleared with `clear_primed`.
+    """
+
+    def __init__(self, vector_store_schema_config: VectorStoreSchemaConfig, dtype: type = np.float32,
+                 **kwargs: Any) -> None:
+        super().__init__(vector_store_schema_config=vector_store_schema_config, **kwargs)
+        self.dtype = np.dtype(dtype)
+        self._ids: list[str] = []
+        self._texts: list[str | None] = []
+        self._attributes: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._matrix = np.empty((0, 0), dtype=self.dtype)
+        self._square_norms = np.empty(0, dtype=np.float32)
+        self._included: np.ndarray | None = None
+        self._primed: dict[bytes, list[VectorStoreSearchResult]] = {}
+        self._primed_uses: dict[bytes, int] = {}
+        self._primings = 0
+
+    def connect(self, **kwargs: Any) -> None:
+        """Read every document of the LanceDB table at `db_uri`."""
+        self.db_connection = lancedb.connect(kwargs["db_uri"])
+        if not self.index_name or self.index_name not in self.db_connection.table_names():
+            return
+        table = self.db_connection.open_table(self.index_name).to_arrow()
+        vectors = table.column(self.vector_field).combine_chunks()
+        matrix = vectors.flatten().to_numpy(zero_copy_only=False).reshape(len(table), -1)
+        self._set(
+            table.column(self.id_field).to_pylist(),
+            table.column(self.text_field).to_pylist(),
+            matrix,
+            table.column(self.attributes_field).to_pylist(),
+        )
+
+    def load_documents(self, documents: list[VectorStoreDocument], overwrite: bool = True) -> None:
+        """Load documents in memory, replacing the current ones unless `overwrite` is False."""
+        documents = [document for document in documents if document.vector is not None]
+        if not overwrite and self._ids:
+            documents = [self.search_by_id(id) for id in self._ids] + documents
+        if not documents:
+            self._set([], [], np.empty((0, self.vector_size), dtype=np.float32), [])
+            return
+        self._set(
+            [str(document.id) for document in documents],
+            [document.text for document in documents],
+            np.asarray([document.vector for document in documents], dtype=np.float32),
+            [json.dumps(document.attributes) for document in documents],
+        )
+
+    def filter_by_id(self, include_ids: list[str] | list[int]) -> Any:
+        """Restrict the next searches to these documents, or to every document when empty."""
+        if len(include_ids) == 0:
+            self._included = self.query_filter = None
+        else:
+            self.query_filter = [str(id) for id in include_ids]
+            self._included = np.asarray(
+                [self._positions[id] for id in self.query_filter if id in self._positions], dtype=np.intp)
+        return self.query_filter
+
+    def similarity_search_by_vector(
+        self, query_embedding: list[float] | np.ndarray, k: int = 10, **kwargs: Any
+    ) -> list[VectorStoreSearchResult]:
+        """Perform an exact similarity search, scoring every (included) document."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        primed = self._primed.get(query.tobytes()) if self._included is None else None
+        if primed is not None and len(primed) >= min(k, len(self._ids)):
+            self._release(query.tobytes())
+            return primed[:k]
+        return self.similarity_search_by_vectors(query[None, :], k)[0]
+
+    def similarity_search_by_vectors(
+        self, query_embeddings: np.ndarray, k: int = 10
+    ) -> list[list[VectorStoreSearchResult]]:
+        """Perform the similarity searches of many queries at once, one row of `query_embeddings` each."""
+        return self._search(np.asarray(query_embeddings, dtype=np.float32), k, self._included)
+
+    def prime(self, query_embeddings: np.ndarray, k: int = 10) -> None:
+        """Search the top-k documents of many queries at once, serving their next search from memory.
+
+        Priming a query again, e.g. for another explorer of the same graph, serves one more search.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        self._primings += 1
+        # Bound the (queries, documents) distance matrix of large batches
+        for start in range(0, len(queries), _PRIME_BLOCK):
+            block = queries[start:start + _PRIME_BLOCK]
+            results = self._search(block, k, rows=None)
+            for query, query_results in zip(block, results):
+                key = query.tobytes()
+                self._primed[key] = query_results
+                self._primed_uses[key] = self._primed_uses.get(key, 0) + 1
+
+    def clear_primed(self) -> None:
+        """End a priming, dropping the primed results never served once every priming is over."""
+        self._primings = max(self._primings - 1, 0)
+        if not self._primings:
+            self._primed, self._primed_uses = {}, {}
+
+    def _release(self, key: bytes) -> None:
+        """Count a search served from a primed result, releasing it once every primed search is served."""
+        uses = self._primed_uses.pop(key, 1) - 1
+        if uses > 0:
+            self._primed_uses[key] = uses
+        else:
+            self._primed.pop(key, None)
+
+    def _search(self, queries: np.ndarray, k: int, rows: np.ndarray | None) -> list[list[VectorStoreSearchResult]]:
+        """Top-k documents of each query among the documents at `rows`, or among every document."""
+        norms = self._square_norms if rows is None else self._square_norms[rows]
+        if not len(norms) or k <= 0:
+            return [[] for _ in queries]
+
+        # Squared L2 distances, as LanceDB ranks them
+        distances = norms[None, :] + np.einsum("ij,ij->i", queries, queries)[:, None]
+        distances -= 2 * self._products(queries, rows)
+        k = min(k, len(norms))
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1, kind="stable")
+        top, top_distances = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_distances, order, axis=1)
+        if rows is not None:
+            top = rows[top]
+        return [
+            [VectorStoreSearchResult(document=self._document(int(position), as_list=False),
+                                     score=1 - abs(float(distance)))
+             for position, distance in zip(positions, scores)]
+            for positions, scores in zip(top, top_distances)
+        ]
+
+    def similarity_search_by_text(
+        self, text: str, text_embedder: TextEmbedder, k: int = 10, **kwargs: Any
+    ) -> list[VectorStoreSearchResult]:
+        """Perform a similarity search using a given input text."""
+        query_embedding = text_embedder(text)
+        if query_embedding:
+            return self.similarity_search_by_vector(query_embedding, k)
+        return []
+
+    def search_by_id(self, id: str) -> VectorStoreDocument:
+        """Search for a document by id, a document without text nor vector if it does not exist."""
+        position = self._positions.get(str(id))
+        if position is None:
+            return VectorStoreDocument(id=id, text=None, vector=None)
+        return self._document(position)
+
+    def _set(self, ids: list[str], texts: list[str | None], matrix: np.ndarray, attributes: list[str]) -> None:
+        matrix = np.asarray(matrix, dtype=np.float32)
+        self._ids, self._texts, self._attributes = ids, texts, attributes
+        self._positions = {id: position for position, id in enumerate(ids)}
+        self._square_norms = np.einsum("ij,ij->i", matrix, matrix)
+        self._matrix = np.ascontiguousarray(matrix, dtype=self.dtype)
+        self._matrix.flags.writeable = False
+        self._included = self.query_filter = None
+        self._primed, self._primed_uses = {}, {}
+        self.vector_size = matrix.shape[1] if matrix.ndim == 2 else self.vector_size
+
+    def _products(self, queries: np.ndarray, rows: np.ndarray | None) -> np.ndarray:
+        """Dot products of the queries with the documents, as a (queries, documents) float32 matrix."""
+        matrix = self._matrix if rows is None else self._matrix[rows]
+        if matrix.dtype == np.float32:
+            return queries @ matrix.T
+        return np.hstack([
+            queries @ matrix[start:start + _HALF_PRECISION_BLOCK].astype(np.float32).T
+            for start in range(0, len(matrix), _HALF_PRECISION_BLOCK)
+        ])
+
+    def _document(self, position: int, as_list: bool = True) -> VectorStoreDocument:
+        """Document at a row of the matrix.
+
+        Search results hold a read-only view of the row rather than a list, converting thousands of
+        floats per result would cost more than the search itself.
+        """
+        vector = self._matrix[position].astype(np.float32, copy=False)
+        return VectorStoreDocument(
+            id=self._ids[position],
+            text=self._texts[position],
+            vector=vector.tolist() if as_list else vector,  # type: ignore[arg-type]
+            attributes=json.loads(self._attributes[position]),
+        )
@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import pickle
+from collections import OrderedDict
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from graphrag.query.structured_search.base import SearchResult
+
+RESULT_CACHE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    """Content-addressed, on-disk cache of search results.
+
+    Results are pickled under the hash of everything that shapes them (query, search type,
+    graph content, model deployment, builder parameters), so any change to one of these
+    misses the cache instead of returning a stale answer. Once the cache grows past
+    `max_bytes`, the least recently used results are evicted.
+
+    The size and access order of the cached results are indexed in memory, from a single scan of
+    the cache folder on creation. Results stored by other processes meanwhile are only accounted
+    for by the next scan.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        # Size of each cached result, from the least to the most recently used
+        self._sizes: OrderedDict[Path, int] = OrderedDict()
+        self._size = 0
+        self._scan()
+
+    @staticmethod
+    def key(**fields: Any) -> str:
+        """Hash the fields identifying a search result."""
+        payload = json.dumps(
+            {"version": RESULT_CACHE_VERSION, **fields}, sort_keys=True, default=str)
+        return sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> SearchResult | None:
+        """Get a cached result, or None if it was never stored or was evicted."""
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                result = pickle.load(f)
+            # Refresh the access time for the LRU eviction of the next runs, whatever the mount options
+            os.utime(path)
+            with self._lock:
+                if path in self._sizes:
+                    self._sizes.move_to_end(path)
+            return result
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning("Ignoring unreadable cached search result %s: %s", path, e)
+            return None
+
+    def put(self, key: str, result: SearchResult) -> None:
+        """Store a result, evicting the least recently used ones past the size budget."""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial result
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_path.open("wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning("Could not cache search result %s: %s", path, e)
+            return
+        with self._lock:
+            self._size += size - self._sizes.pop(path, 0)
+            self._sizes[path] = size
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            for file in self.root.glob("*/*.pkl"):
+                file.unlink(missing_ok=True)
+            self._sizes.clear()
+            self._size = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pkl"
+
+    def _scan(self) -> None:
+        """Index the results cached by previous runs, ordered by their last access."""
+        files = []
+        for file in self.root.glob("*/*.pkl"):
+            try:
+                files.append((file, file.stat()))
+            except FileNotFoundError:
+                continue
+        for file, stat in sorted(files, key=lambda entry: entry[1].st_mtime):
+            self._sizes[file] = stat.st_size
+            self._size += stat.st_size
+
+    def _evict(self) -> None:
+        """Delete the least recently used results until the cache fits in its size budget."""
+        while self._size > self.max_bytes and self._sizes:
+            file, size = self._sizes.popitem(last=False)
+            file.unlink(missing_ok=True)
+            self._size -= size
@@ -1,17 +1,73 @@
+from contextlib import AbstractAsyncContextManager
+
 from graphrag.query.structured_search.global_search.community_context import (
     GlobalCommunityContext,
 )
 from graphrag.query.structured_search.global_search.search import GlobalSearch
 
+from ..concurrency import LimitedChatModel
 from ..graph_context import GraphContext
 
 
 class Global:
     """Graphrag Global Search strategy."""
 
+    CONTEXT_PARAMS = {
+        # False means using full community reports. True means using community short summaries.
+        "use_community_summary": False,
+        "shuffle_data": True,
+        "include_community_rank": True,
+        "min_community_rank": 0,
+        "community_rank_name": "rank",
+        "include_community_weight": True,
+        "community_weight_name": "occurrence weight",
+        "normalize_community_weight": True,
+        # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 5000)
+        "max_tokens": 12_000,
+        "context_name": "Reports",
+    }
+
+    MAP_LLM_PARAMS = {
+        "max_tokens": 1000,
+        "temperature": 0.0,
+        "response_format": {"type": "json_object"},
+    }
+
+    REDUCE_LLM_PARAMS = {
+        # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 1000-1500)
+        "max_tokens": 2000,
+        "temperature": 0.0,
+    }
+
+    # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 5000)
+    MAX_DATA_TOKENS = 12_000
+
+    # set this to True will add instruction to encourage the LLM to incorporate general knowledge in the response, which may increase hallucinations, but could be useful in some use cases.
+    ALLOW_GENERAL_KNOWLEDGE = False
+
+    # free form text describing the response type and format, can be anything, e.g. prioritized list, single paragraph, multiple paragraphs, multiple-page report
+    RESPONSE_TYPE = "multiple paragraphs"
+
+    @classmethod
+    def params(cls) -> dict:
+        """Parameters shaping the search results, used to key cached results."""
+        return {
+            "context_params": cls.CONTEXT_PARAMS,
+            "map_llm_params": cls.MAP_LLM_PARAMS,
+            "reduce_llm_params": cls.REDUCE_LLM_PARAMS,
+            "max_data_tokens": cls.MAX_DATA_TOKENS,
+            "allow_general_knowledge": cls.ALLOW_GENERAL_KNOWLEDGE,
+            "response_type": cls.RESPONSE_TYPE,
+        }
+
     @staticmethod
-    def build(ctx: GraphContext) -> GlobalSearch:
-        """Create and configure a GlobalSearch instance."""
+    def build(ctx: GraphContext, limiter: AbstractAsyncContextManager | None = None) -> GlobalSearch:
+        """Create and configure a GlobalSearch instance.
+
+        The map step runs at most `concurrent_coroutines` LLM calls at once. A limiter (any async
+        context manager, e.g. an adaptive limiter shared per deployment) further bounds every
+        LLM call of the search, map and reduce steps alike.
+        """
         context_builder = GlobalCommunityContext(
             community_reports=ctx.community_reports,
             communities=ctx.communities,
@@ -19,46 +75,19 @@ class Global:
             entities=ctx.entities,
             tokenizer=ctx.tokenizer,
         )
-        context_builder_params = {
-            # False means using full community reports. True means using community short summaries.
-            "use_community_summary": False,
-            "shuffle_data": True,
-            "include_community_rank": True,
-            "min_community_rank": 0,
-            "community_rank_name": "rank",
-            "include_community_weight": True,
-            "community_weight_name": "occurrence weight",
-            "normalize_community_weight": True,
-            # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 5000)
-            "max_tokens": 12_000,
-            "context_name": "Reports",
-        }
-
-        map_llm_params = {
-            "max_tokens": 1000,
-            "temperature": 0.0,
-            "response_format": {"type": "json_object"},
-        }
-
-        reduce_llm_params = {
-            # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 1000-1500)
-            "max_tokens": 2000,
-            "temperature": 0.0,
-        }
-        return GlobalSearch(
-            model=ctx.chat_model,
+        search = GlobalSearch(
+            model=LimitedChatModel(ctx.chat_model, limiter) if limiter is not None else ctx.chat_model,
             context_builder=context_builder,
             tokenizer=ctx.tokenizer,
-            # change this based on the token limit you have on your model (if you are using a model with 8k limit, a good setting could be 5000)
-            max_data_tokens=12_000,
-            map_llm_params=map_llm_params,
-            reduce_llm_params=reduce_llm_params,
-            # set this to True will add instruction to encourage the LLM to incorporate general knowledge in the response, which may increase hallucinations, but could be useful in some use cases.
-            allow_general_knowledge=False,
+            max_data_tokens=Global.MAX_DATA_TOKENS,
+            # GlobalSearch adjusts the map params to the JSON mode, keep the class defaults intact
+            map_llm_params=dict(Global.MAP_LLM_PARAMS),
+            reduce_llm_params=Global.REDUCE_LLM_PARAMS,
+            allow_general_knowledge=Global.ALLOW_GENERAL_KNOWLEDGE,
             # set this to False if your LLM model does not support JSON mode.
             json_mode=True,
-            context_builder_params=context_builder_params,
+            context_builder_params=Global.CONTEXT_PARAMS,
             concurrent_coroutines=32,
-            # free form text describing the response type and format, can be anything, e.g. prioritized list, single paragraph, multiple paragraphs, multiple-page report
-            response_type="multiple paragraphs",
+            response_type=Global.RESPONSE_TYPE,
         )
+        return search
@@ -0,0 +1,75 @@
+import re
+from dataclasses import dataclass
+from typing import ClassVar
+
+import numpy as np
+from graphrag.vector_stores.base import BaseVectorStore
+
+from .graph_context import GraphContext
+from .search_builder import SearchType
+
+# Wording of questions about the corpus as a whole rather than about specific entities
+THEMATIC_CUES = re.compile(
+    r"\b(themes?|overall|main (ideas?|points?|topics?)|summar(y|ize|ise)|across|throughout|whole|entire"
+    r"|in general|lessons?|morals?|trends?|key takeaways?)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """Search strategy picked for a query, with the features it was picked from."""
+
+    type: SearchType
+    entity_similarity: float
+    """Cosine similarity of the query to the closest entity description"""
+    report_similarity: float
+    """Cosine similarity of the query to the closest community report"""
+    thematic: bool
+    """Whether the query uses corpus-wide wording"""
+
+
+class SearchRouter:
+    """Pick the cheapest search strategy adequate for a query, without calling the chat model.
+
+    Local search answers questions about specific entities for a fraction of the cost of global
+    search, which maps over every community report. A query only goes to global search when it
+    reads as corpus-wide: its embedding is closer to a community report than to any entity
+    description by `REPORT_MARGIN`, or it uses thematic wording and matches no entity closely.
+    DRIFT search is never picked, it has to be requested explicitly.
+    """
+
+    REPORT_MARGIN: ClassVar[float] = 0.05
+    ENTITY_MATCH: ClassVar[float] = 0.6
+
+    def __init__(self, ctx: GraphContext) -> None:
+        self._ctx = ctx
+
+    async def route(self, query: str) -> RoutingDecision:
+        """Pick the search strategy of a query from its embedding and wording."""
+        if not query.strip():
+            return RoutingDecision(SearchType.LOCAL, 0.0, 0.0, False)
+
+        embedding = np.asarray(await self._ctx.text_embedder.aembed(query), dtype=np.float32)
+        entity_similarity = _best_similarity(self._ctx.description_embedding_store, embedding)
+        report_similarity = _best_similarity(self._ctx.full_content_embedding_store, embedding)
+        thematic = THEMATIC_CUES.search(query) is not None
+
+        corpus_wide = (report_similarity - entity_similarity > self.REPORT_MARGIN
+                       or (thematic and entity_similarity < self.ENTITY_MATCH))
+        return RoutingDecision(
+            type=SearchType.GLOBAL if corpus_wide else SearchType.LOCAL,
+            entity_similarity=entity_similarity,
+            report_similarity=report_similarity,
+            thematic=thematic,
+        )
+
+
+def _best_similarity(store: BaseVectorStore, embedding: np.ndarray) -> float:
+    """Cosine similarity of the embedding to the closest document of the store, 0 if it is empty."""
+    results = store.similarity_search_by_vector(embedding, k=1)
+    if not results or results[0].document.vector is None:
+        return 0.0
+    vector = np.asarray(results[0].document.vector, dtype=np.float32)
+    norms = float(np.linalg.norm(vector) * np.linalg.norm(embedding))
+    return float(vector @ embedding) / norms if norms else 0.0
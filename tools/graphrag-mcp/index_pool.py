@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import tomllib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from graphrag.config.models.language_model_config import LanguageModelConfig
+
+from graph_sdk import GraphExplorer, GraphRegistry, SemanticCache
+from graph_sdk.concurrency import limiter_for
+
+logger = logging.getLogger(__name__)
+
+# Start with 8 concurrent LLM calls in global searches, up to the 32 graphrag defaults to, shared by the workers
+LLM_CONCURRENCY = {"initial_limit": 8, "max_limit": 32}
+
+
+@dataclass(frozen=True)
+class IndexConfig:
+    """A knowledge graph served by the MCP server."""
+
+    name: str
+    path: Path
+    description: str = ""
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Indexes served by the MCP server, as read from its configuration file."""
+
+    indexes: dict[str, IndexConfig]
+    default: str
+    memory_budget: int
+    """Maximum size of the loaded indexes, in bytes"""
+    reload_interval: float = 30.0
+    """Seconds between two checks of the loaded indexes artifacts, 0 to never reload them"""
+
+    @classmethod
+    def load(cls, path: Path) -> "PoolConfig":
+        """Read the configuration file, index paths being relative to its folder."""
+        with open(path, "rb") as f:
+            config = tomllib.load(f)
+        indexes = {
+            name: IndexConfig(name, path.parent / index["path"], index.get("description", ""))
+            for name, index in config["indexes"].items()
+        }
+        default = config.get("default", next(iter(indexes)))
+        assert default in indexes, f"Default index {default} is not configured."
+        return cls(indexes, default, int(config.get("memory_budget_mb", 2048)) * 1024 * 1024,
+                   float(config.get("reload_interval_s", 30.0)))
+
+    @classmethod
+    def single(cls, graph_path: Path) -> "PoolConfig":
+        """Serve a single graph, as the server did before the configuration file existed."""
+        return cls({"default": IndexConfig("default", graph_path)}, "default", 0)
+
+
+class IndexPool:
+    """Named graph explorers, loaded on their first search and unloaded when least recently used.
+
+    The size of an index is estimated from its artifacts on disk. Once the loaded indexes exceed the
+    memory budget, the least recently used ones are unloaded: searches still running on them finish,
+    then their tables are freed. A budget of 0 never unloads any index.
+    Every explorer shares the chat and embedding models registered in graphrag's ModelManager,
+    so hosting many indexes only costs their tables.
+
+    Loaded indexes whose artifacts are rewritten on disk are reloaded without downtime: once the
+    artifacts stop changing, a new explorer is built and preloaded in the background, then swapped
+    in. Searches already running keep the previous explorer and finish on the previous tables.
+    Forked worker processes each watch their own indexes: their explorers are swapped in their
+    own memory, which a single watcher in the parent process could not reach. Checks only stat
+    the artifacts, and reloaded tables are no longer shared between workers anyway.
+    """
+
+    def __init__(self, config: PoolConfig, chat_config: LanguageModelConfig,
+                 embedding_config: LanguageModelConfig, semantic_cache: SemanticCache | None = None,
+                 workers: int = 1) -> None:
+        self.config = config
+        # Each worker process bounds its own LLM calls, with its share of the deployment's limits
+        self._llm_concurrency = {name: max(1, limit // workers) for name, limit in LLM_CONCURRENCY.items()}
+        self._chat_config = chat_config
+        self._embedding_config = embedding_config
+        self._semantic_cache = semantic_cache
+        self._explorers: OrderedDict[str, GraphExplorer] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._loading: dict[str, asyncio.Task[GraphExplorer]] = {}
+        self._fingerprints: dict[str, tuple] = {}
+        self._watcher: asyncio.Task[None] | None = None
+
+    async def get(self, name: str | None = None) -> GraphExplorer:
+        """Get the explorer of an index, the default one when no name is given, loading it if needed."""
+        name = name or self.config.default
+        if self._watcher is None and self.config.reload_interval:
+            self._watcher = asyncio.create_task(self._watch())
+        if name not in self.config.indexes:
+            raise KeyError(f"Unknown index {name}, available indexes: {', '.join(self.config.indexes)}")
+
+        if name in self._explorers:
+            self._explorers.move_to_end(name)
+            return self._explorers[name]
+
+        # Concurrent requests for an index being loaded wait for the same load, which a cancelled request
+        # leaves running for the others
+        if name not in self._loading:
+            self._loading[name] = asyncio.create_task(self._load(self.config.indexes[name]))
+            self._loading[name].add_done_callback(partial(self._loaded, name))
+        return await asyncio.shield(self._loading[name])
+
+    @property
+    def loaded(self) -> list[str]:
+        """Names of the loaded indexes, from the least to the most recently used."""
+        return list(self._explorers)
+
+    def preload_tables(self) -> None:
+        """Read the tables of the indexes fitting in the memory budget, the default index first.
+
+        Explorers are still created on the first search of each index, reusing the loaded tables.
+        LanceDB is not opened, so that processes forked afterwards can still use it.
+        """
+        preloaded = 0
+        for index in sorted(self.config.indexes.values(), key=lambda index: index.name != self.config.default):
+            size = _size_on_disk(index.path)
+            if self.config.memory_budget and preloaded + size > self.config.memory_budget:
+                continue
+            GraphRegistry.get_or_load(index.path).load_tables()
+            preloaded += size
+            logger.info("Preloaded the tables of index %s", index.name)
+
+    async def _load(self, index: IndexConfig) -> GraphExplorer:
+        # Tables are read lazily, but the models and tokenizer setup still blocks for a while
+        self._fingerprints[index.name] = await asyncio.to_thread(GraphRegistry.fingerprint, index.path)
+        explorer = await asyncio.to_thread(self._explorer, index)
+        self._sizes[index.name] = _size_on_disk(index.path)
+        self._explorers[index.name] = explorer
+        self._evict(keep=index.name)
+        logger.info("Loaded index %s from %s", index.name, index.path)
+        return explorer
+
+    def _loaded(self, name: str, load: asyncio.Task[GraphExplorer]) -> None:
+        """Forget a completed load, a failed one being retried by the next request."""
+        if self._loading.get(name) is load:
+            del self._loading[name]
+
+    async def _watch(self) -> None:
+        """Reload the loaded indexes whose artifacts changed, once they are left unchanged for an interval."""
+        changed: dict[str, tuple] = {}
+        while True:
+            await asyncio.sleep(self.config.reload_interval)
+            for name in list(self._explorers):
+                try:
+                    fingerprint = await asyncio.to_thread(GraphRegistry.fingerprint, self.config.indexes[name].path)
+                except OSError:
+                    # An artifact was replaced while listing them, check again on the next interval
+                    continue
+                if fingerprint == self._fingerprints.get(name):
+                    changed.pop(name, None)
+                elif changed.get(name) != fingerprint:
+                    # The indexer writes the artifacts one by one, wait until it is done
+                    changed[name] = fingerprint
+                else:
+                    del changed[name]
+                    await self._reload(self.config.indexes[name], fingerprint)
+
+    async def _reload(self, index: IndexConfig, fingerprint: tuple) -> None:
+        """Build and preload a new explorer of the index, then swap it with the current one."""
+        # Retry on the next change of the artifacts only, whether this reload succeeds or not
+        self._fingerprints[index.name] = fingerprint
+        try:
+            explorer = await asyncio.to_thread(self._preloaded, index)
+        except Exception:
+            logger.exception("Failed to reload index %s, still serving the previous version", index.name)
+            return
+        # The index may have been unloaded meanwhile
+        if index.name in self._explorers:
+            self._explorers[index.name] = explorer
+            if self._semantic_cache is not None:
+                self._semantic_cache.invalidate(index.path)
+            self._sizes[index.name] = _size_on_disk(index.path)
+            self._evict(keep=index.name)
+            logger.info("Reloaded index %s from %s", index.name, index.path)
+
+    def _preloaded(self, index: IndexConfig) -> GraphExplorer:
+        explorer = self._explorer(index)
+        explorer.preload()
+        return explorer
+
+    def _explorer(self, index: IndexConfig) -> GraphExplorer:
+        # Every index shares the limiter of the LLM calls of the chat deployment
+        llm_limiter = limiter_for(str(self._chat_config.deployment_name), scope="llm", **self._llm_concurrency)
+        explorer = GraphExplorer(index.path, self._chat_config, self._embedding_config, llm_limiter=llm_limiter,
+                                 semantic_cache=self._semantic_cache)
+        # Hash the artifacts in this worker thread, rather than on the event loop when first searching
+        explorer.graph_hash
+        return explorer
+
+    def _evict(self, keep: str) -> None:
+        """Unload the least recently used indexes until the loaded ones fit in the memory budget."""
+        if not self.config.memory_budget:
+            return
+        for name in list(self._explorers):
+            if sum(self._sizes[loaded] for loaded in self._explorers) <= self.config.memory_budget:
+                return
+            if name != keep:
+                del self._explorers[name]
+                GraphRegistry.unload(self.config.indexes[name].path)
+                if self._semantic_cache is not None:
+                    self._semantic_cache.invalidate(self.config.indexes[name].path)
+                logger.info("Unloaded index %s to fit the memory budget", name)
+
+
+def _size_on_disk(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
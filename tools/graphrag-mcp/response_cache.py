@@ -0,0 +1,138 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+# Progress of a search, as a progress value and a message
+Publish = Callable[[float, str], None]
+OnProgress = Callable[[float, str], Awaitable[None]]
+
+
+@dataclass
+class _Search(Generic[T]):
+    task: asyncio.Task[T] = field(init=False)
+    events: list[tuple[float, str]] = field(default_factory=list)
+    """Progress published so far, replayed to requests joining the search"""
+    followers: list[asyncio.Queue[tuple[float, str]]] = field(default_factory=list)
+
+    def publish(self, progress: float, message: str) -> None:
+        self.events.append((progress, message))
+        for queue in self.followers:
+            queue.put_nowait((progress, message))
+
+
+class ResponseCache(Generic[T]):
+    """In-process LRU cache of search responses, expiring after a time to live.
+
+    Concurrent requests for a search that is not cached yet are coalesced: a single search runs
+    and every request awaits its response. The search runs in its own task, bound to no request,
+    so a client giving up does not cancel it for the others. Its progress is published to every
+    request following it, each one forwarding it to its own client. Failed searches are not cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, T]] = OrderedDict()
+        self._in_flight: dict[Hashable, _Search[T]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so that near-identical ones (case, spacing, final punctuation) share a key."""
+        return re.sub(r"\s+", " ", query).strip().rstrip("?!.").strip().casefold()
+
+    async def get_or_search(self, key: Hashable, search: Callable[[Publish], Awaitable[T]],
+                            on_progress: OnProgress | None = None) -> T:
+        """Get the cached response of a search, running it only if no identical search is already running.
+
+        `search` is called with a function publishing its progress. With `on_progress`, the progress of
+        the search is forwarded to it, from the start of the search even when joining it late.
+        """
+        response = self.get(key)
+        if response is not None:
+            self.hits += 1
+            return response
+
+        running = self._in_flight.get(key)
+        if running is None:
+            self.misses += 1
+            running = _Search()
+            running.task = asyncio.ensure_future(search(running.publish))
+            self._in_flight[key] = running
+            running.task.add_done_callback(partial(self._complete, key))
+        else:
+            self.coalesced += 1
+        if on_progress is not None:
+            await self._follow(running, on_progress)
+        return await asyncio.shield(running.task)
+
+    def get(self, key: Hashable) -> T | None:
+        """Get a cached response, None if it was never cached, evicted or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def put(self, key: Hashable, response: T) -> None:
+        """Cache a response, evicting the least recently used ones past `max_entries`."""
+        if not self.max_entries:
+            return
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, int | float]:
+        """Hit, miss and coalesced request counters, with the number of cached responses."""
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / requests if requests else 0.0,
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+        }
+
+    @staticmethod
+    async def _follow(running: _Search[T], on_progress: OnProgress) -> None:
+        """Forward the progress of a running search until it completes."""
+        queue: asyncio.Queue[tuple[float, str]] = asyncio.Queue()
+        for event in running.events:
+            queue.put_nowait(event)
+        running.followers.append(queue)
+        try:
+            while not running.task.done() or not queue.empty():
+                if queue.empty():
+                    next_event = asyncio.ensure_future(queue.get())
+                    try:
+                        await asyncio.wait([next_event, running.task], return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        # No effect once an event was received, a pending get leaves the queue untouched
+                        next_event.cancel()
+                    if not next_event.done() or next_event.cancelled():
+                        continue
+                    event = next_event.result()
+                else:
+                    event = queue.get_nowait()
+                await on_progress(*event)
+        finally:
+            running.followers.remove(queue)
+
+    def _complete(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        del self._in_flight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.put(key, task.result())
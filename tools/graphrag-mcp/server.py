@@ -1,23 +1,170 @@
+import asyncio
+import gc
+import os
+import signal
+import socket
+from functools import partial
 from os import getenv
 from pathlib import Path
+from typing import Literal
 
+import uvicorn
 from dotenv import load_dotenv
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from graphrag.config.enums import ModelType
 from graphrag.config.models.language_model_config import LanguageModelConfig
+from pydantic import BaseModel
 
-from graph_sdk import GraphExplorer
+from graph_sdk import AnnSearch, GraphArtifacts, GraphExplorer, SearchType, SemanticCache
+from index_pool import IndexPool, PoolConfig
+from response_cache import Publish, ResponseCache
 
 load_dotenv()
 
 mcp = FastMCP("GraphRAG MCP Server")
-graph: GraphExplorer
+indexes: IndexPool
+
+# Searches running at once across every tool call, bounding the load on the chat deployment.
+# Worker processes each get their share of it
+SEARCH_CONCURRENCY = int(getenv("SEARCH_CONCURRENCY", "8"))
+search_limiter = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+# Strategy and response of recent searches, keyed on the graph version, normalized query and mode
+response_cache: ResponseCache[tuple[SearchType, str]] = ResponseCache(
+    max_entries=int(getenv("RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(getenv("RESPONSE_CACHE_TTL_S", "3600")),
+)
+
+
+# "auto" lets the server route each query to the cheapest adequate strategy, see SearchRouter.
+# Opt-in: clients not passing a mode keep getting local searches
+SearchMode = Literal["auto", "local", "global", "drift"]
+
+
+class BatchQuery(BaseModel):
+    query: str
+    mode: SearchMode = "local"
+    index: str | None = None
+
+
+class BatchResult(BaseModel):
+    query: str
+    mode: SearchMode
+    index: str | None = None
+    type: SearchType | None = None
+    response: str | None = None
+    error: str | None = None
+
+
+@mcp.tool
+def list_indexes() -> dict[str, str]:
+    """List the knowledge graphs that can be searched, with their description."""
+    return {name: index.description for name, index in indexes.config.indexes.items()}
 
 
 @mcp.tool
-async def search(query: str) -> str:
-    result = await graph.search(query)
-    return str(result.response)
+async def search(query: str, ctx: Context, mode: SearchMode = "local", stream: bool = False,
+                 index: str | None = None) -> str:
+    """Search a knowledge graph for the query and return the response.
+
+    `index` names the graph to search, as listed by the list_indexes tool, the default one otherwise.
+
+    `mode` selects the search strategy: local search for questions about specific characters,
+    places or events, global search for questions about the whole story, DRIFT search for
+    broad questions needing details. "auto" picks local or global search from the query.
+    Defaults to local search.
+
+    With `stream` set, progress notifications announce the context building, then carry each
+    chunk of the response as the chat model generates it. The full response is still returned.
+    """
+    graph = await indexes.get(index)
+    _, response = await __cached_search(graph, query, mode, ctx if stream else None)
+    return response
+
+
+@mcp.tool
+def cache_stats() -> dict[str, int | float]:
+    """Hits, misses and coalesced requests of the response cache of the server process."""
+    return response_cache.stats()
+
+
+@mcp.tool
+async def batch_search(queries: list[BatchQuery], ctx: Context) -> list[BatchResult]:
+    """Search the graph for many queries at once, e.g. the sub-questions of a multi-hop question.
+
+    Each query takes a search mode and an index, as for the search tool. Queries run concurrently and
+    identical queries of the batch are only searched once. Each result is sent as a progress
+    notification as soon as it completes, the returned list then holds every result in the
+    order of the queries, along with the search strategy that answered it.
+    """
+    unique = list(dict.fromkeys((item.query, item.mode, item.index) for item in queries))
+    results: dict[tuple[str, SearchMode, str | None], BatchResult] = {}
+
+    for completed, pending in enumerate(asyncio.as_completed([__batch_search(*key) for key in unique]), 1):
+        result = await pending
+        results[(result.query, result.mode, result.index)] = result
+        await ctx.report_progress(completed, len(unique), message=result.model_dump_json())
+
+    return [results[(item.query, item.mode, item.index)] for item in queries]
+
+
+async def __batch_search(query: str, mode: SearchMode, index: str | None) -> BatchResult:
+    """Run a single search of a batch, reporting its failure instead of failing the batch."""
+    result = BatchResult(query=query, mode=mode, index=index)
+    try:
+        graph = await indexes.get(index)
+        result.type, result.response = await __cached_search(graph, query, mode)
+    except Exception as e:
+        result.error = repr(e)
+    return result
+
+
+async def __cached_search(graph: GraphExplorer, query: str, mode: SearchMode,
+                          ctx: Context | None = None) -> tuple[SearchType, str]:
+    """
+    Search the graph through the response cache, identical concurrent searches running only once.
+    With a context, the progress of the search is forwarded to it as notifications, or the response
+    sent at once when it was cached or searched without streaming by an identical request.
+    """
+    reported = 0
+
+    async def report(progress: float, message: str) -> None:
+        nonlocal reported
+        reported += 1
+        await ctx.report_progress(progress, message=message)
+
+    # The search is shared by every identical request, it streams when the first one does
+    search = partial(__search, graph, query, mode, ctx is not None)
+    key = (graph.graph_hash, ResponseCache.normalize(query), mode)
+    type, response = await response_cache.get_or_search(key, search, report if ctx is not None else None)
+    if ctx is not None and not reported:
+        await ctx.report_progress(0, message=f"Serving a complete {type.value} search response")
+        await ctx.report_progress(1, message=response)
+    return type, response
+
+
+async def __search(graph: GraphExplorer, query: str, mode: SearchMode, stream: bool,
+                   publish: Publish) -> tuple[SearchType, str]:
+    """Search the graph, publishing the response as it is generated when streaming."""
+    type = await __search_type(graph, query, mode)
+    async with search_limiter:
+        if not stream:
+            result = await graph.search(query, type)
+            return type, str(result.response)
+
+        publish(0, f"Building the {type.value} search context")
+        chunks = []
+        async for chunk in graph.stream_search(query, type):
+            chunks.append(chunk)
+            publish(len(chunks), chunk)
+    return type, "".join(chunks)
+
+
+async def __search_type(graph: GraphExplorer, query: str, mode: SearchMode) -> SearchType:
+    """Resolve the search strategy of a query, routing it when the mode is "auto"."""
+    if mode == "auto":
+        return (await graph.route(query)).type
+    return SearchType(mode)
 
 
 def main():
@@ -50,14 +197,73 @@ def main():
         api_key=getenv("EMBEDDING_API_KEY", None)
     )
 
-    global graph
-    graph = GraphExplorer(
-        graph_path=Path("./graph/output"),
-        chat_config=chat_model,
-        embedding_config=embedding_model
-    )
+    # Without a configuration file, only serve the graph of the project
+    config_path = Path(getenv("GRAPH_INDEXES_CONFIG", "indexes.toml"))
+    config = PoolConfig.load(config_path) if config_path.exists() else PoolConfig.single(Path("./graph/output"))
+
+    # Opt-in: paraphrases of a previous query get its answer, but so may a similar query about other entities
+    semantic_threshold = float(getenv("SEMANTIC_CACHE_THRESHOLD") or 0)
+    semantic_cache = SemanticCache(threshold=semantic_threshold) if semantic_threshold else None
+
+    # Options of the approximate searches on indexed embedding stores, LanceDB defaults otherwise
+    ann_nprobes = getenv("ANN_NPROBES")
+    if ann_nprobes:
+        GraphArtifacts.ANN_SEARCH = AnnSearch(
+            nprobes=int(ann_nprobes),
+            refine_factor=int(getenv("ANN_REFINE_FACTOR") or 0) or None,
+            build_missing=getenv("ANN_BUILD_MISSING", "false").lower() == "true",
+        )
+
+    # Each process runs a single event loop, which CPU-bound context building blocks.
+    # Serve from several processes to scale searches with the cores of the node
+    workers = int(getenv("MCP_WORKERS", "1"))
+
+    global indexes
+    indexes = IndexPool(config, chat_config=chat_model, embedding_config=embedding_model,
+                        semantic_cache=semantic_cache, workers=workers)
+
+    if workers > 1:
+        __serve_workers(workers, port=8000)
+    else:
+        mcp.run(transport="http", port=8000)
+
+
+def __serve_workers(workers: int, port: int, host: str = "127.0.0.1") -> None:
+    """
+    Serve the MCP server from forked worker processes accepting connections on a shared socket.
+    The graph tables and content hashes are read once before forking, so every worker shares them instead of
+    loading its own. LanceDB is left unopened until then, each worker reads its own embedding stores.
+    Requests of a session may reach any worker, the HTTP transport is therefore stateless. Each worker gets
+    its share of the search limit, so that the workers together run at most `SEARCH_CONCURRENCY` searches.
+    """
+    indexes.preload_tables()
+    # Keep the preloaded objects out of the garbage collector, whose scans would copy their pages in every worker
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            global search_limiter
+            search_limiter = asyncio.Semaphore(max(1, SEARCH_CONCURRENCY // workers))
+            app = mcp.http_app(stateless_http=True)
+            uvicorn.Server(uvicorn.Config(app, log_level="info")).run(sockets=[sock])
+            os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for child in children:
+            os.kill(child, signal.SIGTERM)
 
-    mcp.run(transport="http", port=8000)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for child in children:
+        os.waitpid(child, 0)
 
 
 if __name__ == "__main__":
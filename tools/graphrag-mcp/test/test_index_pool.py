@@ -0,0 +1,139 @@
+import asyncio
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from index_pool import IndexConfig, IndexPool, PoolConfig
+
+
+class Explorer:
+    """Explorer of an index, recording its preloading."""
+
+    def __init__(self, index: IndexConfig):
+        self.index = index
+        self.preloaded = False
+
+    def preload(self) -> None:
+        self.preloaded = True
+
+
+def _graph(root: Path, name: str, size: int) -> Path:
+    path = root / name
+    path.mkdir()
+    (path / "entities.parquet").write_bytes(b"0" * size)
+    return path
+
+
+@pytest.fixture
+def explorers(monkeypatch):
+    """Build explorers without models nor tables, failing for the indexes listed."""
+    failing: set[str] = set()
+
+    def explorer(self, index: IndexConfig) -> Explorer:
+        if index.name in failing:
+            raise RuntimeError(f"{index.name} is being rewritten")
+        return Explorer(index)
+
+    monkeypatch.setattr(IndexPool, "_explorer", explorer)
+    return failing
+
+
+async def _stop(pool: IndexPool) -> None:
+    if pool._watcher is not None:
+        pool._watcher.cancel()
+        await asyncio.gather(pool._watcher, return_exceptions=True)
+
+
+def test_config_paths_are_relative_to_the_config_file(tmp_path):
+    config_path = tmp_path / "indexes.toml"
+    config_path.write_text('memory_budget_mb = 1\n'
+                           '[indexes.a]\npath = "graphs/a"\n'
+                           '[indexes.b]\npath = "graphs/b"\ndescription = "Second graph"\n')
+    config = PoolConfig.load(config_path)
+
+    assert config.default == "a"
+    assert config.memory_budget == 1024 * 1024
+    assert config.reload_interval == 30.0
+    assert config.indexes["b"] == IndexConfig("b", tmp_path / "graphs" / "b", "Second graph")
+
+
+def test_default_index_must_be_configured(tmp_path):
+    config_path = tmp_path / "indexes.toml"
+    config_path.write_text('default = "missing"\n[indexes.a]\npath = "a"\n')
+    with pytest.raises(AssertionError):
+        PoolConfig.load(config_path)
+
+
+async def test_unknown_index_is_rejected(tmp_path, explorers):
+    pool = IndexPool(PoolConfig.single(_graph(tmp_path, "a", 10)), None, None)
+    with pytest.raises(KeyError, match="available indexes: default"):
+        await pool.get("missing")
+    await _stop(pool)
+
+
+async def test_concurrent_requests_share_the_load(tmp_path, explorers):
+    pool = IndexPool(PoolConfig.single(_graph(tmp_path, "a", 10)), None, None)
+    first, second = await asyncio.gather(pool.get(), pool.get("default"))
+    assert first is second
+    await _stop(pool)
+
+
+async def test_cancelled_request_leaves_the_shared_load_running(tmp_path, monkeypatch):
+    loads = []
+    release = threading.Event()
+
+    def explorer(self, index: IndexConfig) -> Explorer:
+        loads.append(index.name)
+        release.wait()
+        return Explorer(index)
+
+    monkeypatch.setattr(IndexPool, "_explorer", explorer)
+    pool = IndexPool(PoolConfig.single(_graph(tmp_path, "a", 10)), None, None)
+    leaving = asyncio.create_task(pool.get())
+    await asyncio.sleep(0.05)
+    leaving.cancel()
+    staying = asyncio.create_task(pool.get())
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert (await staying).index.name == "default"
+    assert leaving.cancelled()
+    assert loads == ["default"]
+    await _stop(pool)
+
+
+async def test_least_recently_used_indexes_are_unloaded_past_the_budget(tmp_path, explorers):
+    indexes = {name: IndexConfig(name, _graph(tmp_path, name, 100)) for name in "abc"}
+    pool = IndexPool(PoolConfig(indexes, "a", memory_budget=250, reload_interval=0), None, None)
+
+    await pool.get("a")
+    await pool.get("b")
+    await pool.get("a")
+    await pool.get("c")
+    assert pool.loaded == ["a", "c"]
+
+    # An index larger than the budget is still served, alone
+    indexes["d"] = IndexConfig("d", _graph(tmp_path, "d", 300))
+    await pool.get("d")
+    assert pool.loaded == ["d"]
+
+
+async def test_rewritten_index_is_reloaded_once_unchanged(tmp_path, explorers):
+    path = _graph(tmp_path, "a", 10)
+    pool = IndexPool(PoolConfig({"a": IndexConfig("a", path)}, "a", 0, reload_interval=0.01), None, None)
+    previous = await pool.get()
+
+    # A failed reload keeps serving the previous explorer, until the artifacts change again
+    explorers.add("a")
+    os.utime(path / "entities.parquet", ns=(1, 1))
+    await asyncio.sleep(0.1)
+    assert await pool.get() is previous
+
+    explorers.clear()
+    os.utime(path / "entities.parquet", ns=(2, 2))
+    await asyncio.sleep(0.1)
+    reloaded = await pool.get()
+    assert reloaded is not previous and reloaded.preloaded
+    await _stop(pool)
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+class Search:
+    """Search publishing a few chunks, blocked until released."""
+
+    def __init__(self, chunks: list[str]):
+        self.chunks = chunks
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, publish) -> str:
+        self.calls += 1
+        publish(0, "start")
+        self.started.set()
+        await self.release.wait()
+        for i, chunk in enumerate(self.chunks, 1):
+            publish(i, chunk)
+            await asyncio.sleep(0)
+        return "".join(self.chunks)
+
+
+async def _immediate(publish) -> str:
+    return "response"
+
+
+def test_normalize_ignores_case_spacing_and_final_punctuation():
+    assert ResponseCache.normalize("  Who is  Scrooge?? ") == ResponseCache.normalize("who is scrooge")
+
+
+async def test_searches_once_then_hits():
+    cache = ResponseCache()
+    assert await cache.get_or_search("key", _immediate) == "response"
+    assert await cache.get_or_search("key", _immediate) == "response"
+    assert cache.stats() | {"hit_ratio": 0} == {
+        "hits": 1, "misses": 1, "coalesced": 0, "hit_ratio": 0, "entries": 1, "in_flight": 0}
+
+
+def test_least_recently_used_responses_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert [cache.get(key) for key in "abc"] == [1, None, 3]
+
+
+def test_responses_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("response_cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.put("a", 1)
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+async def test_identical_concurrent_searches_are_coalesced():
+    cache = ResponseCache()
+    search = Search(["a", "b"])
+    requests = [asyncio.create_task(cache.get_or_search("key", search)) for _ in range(3)]
+    await search.started.wait()
+    search.release.set()
+
+    assert await asyncio.gather(*requests) == ["ab"] * 3
+    assert search.calls == 1
+    assert cache.stats()["coalesced"] == 2
+
+
+async def test_failed_searches_are_not_cached():
+    cache = ResponseCache()
+
+    async def failing(publish) -> str:
+        raise RuntimeError("search failed")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_search("key", failing)
+    assert await cache.get_or_search("key", _immediate) == "response"
+
+
+async def test_each_request_follows_the_progress_of_the_shared_search():
+    cache = ResponseCache()
+    search = Search(["a", "b"])
+    first, late = [], []
+
+    async def follow(events, progress, message):
+        events.append((progress, message))
+
+    requests = [asyncio.create_task(cache.get_or_search("key", search, lambda *e: follow(first, *e)))]
+    await search.started.wait()
+    # Joining after the start of the search, its first progress is replayed
+    requests.append(asyncio.create_task(cache.get_or_search("key", search, lambda *e: follow(late, *e))))
+    requests.append(asyncio.create_task(cache.get_or_search("key", search)))
+    await asyncio.sleep(0)
+    search.release.set()
+
+    assert await asyncio.gather(*requests) == ["ab"] * 3
+    assert first == late == [(0, "start"), (1, "a"), (2, "b")]
+
+
+async def test_cancelled_request_does_not_cancel_the_shared_search():
+    cache = ResponseCache()
+    search = Search(["a"])
+
+    async def follow(progress, message):
+        pass
+
+    leaving = asyncio.create_task(cache.get_or_search("key", search, follow))
+    staying = asyncio.create_task(cache.get_or_search("key", search, follow))
+    await search.started.wait()
+    leaving.cancel()
+    search.release.set()
+
+    assert await staying == "a"
+    assert leaving.cancelled()
+    assert cache.get("key") == "a"
@@ -34,3 +34,78 @@ async def test_search_tool_empty_query(mcp_client):
     async with mcp_client:
         result = await mcp_client.call_tool("search", {"query": ""})
         assert result is not None, "Search tool should return a result even for empty query"
+
+
+@pytest.mark.asyncio
+async def test_batch_search_tool_deduplicates_queries(mcp_client):
+    """
+    Batch search returns one result per query, in order, even for duplicated queries.
+
+    NOTE: THIS IS AN END-TO-END TEST AND REQUIRES THE MCP SERVER TO BE RUNNING LOCALLY.
+    PLEASE START THE MCP SERVER BEFORE RUNNING THIS TEST.
+    """
+    queries = [
+        {"query": "Who is Scrooge's business partner?"},
+        {"query": "Who is Tiny Tim?"},
+        {"query": "Who is Scrooge's business partner?"},
+    ]
+    async with mcp_client:
+        result = await mcp_client.call_tool("batch_search", {"queries": queries})
+
+        results = result.structured_content["result"]
+        assert [item["query"] for item in results] == [item["query"] for item in queries]
+        assert results[0] == results[2], "Duplicated queries should share the same result"
+
+
+@pytest.mark.asyncio
+async def test_search_tool_streams_response(mcp_client):
+    """
+    Streamed searches send the response chunks as progress notifications.
+
+    NOTE: THIS IS AN END-TO-END TEST AND REQUIRES THE MCP SERVER TO BE RUNNING LOCALLY.
+    PLEASE START THE MCP SERVER BEFORE RUNNING THIS TEST.
+    """
+    messages = []
+
+    async def on_progress(progress, total, message):
+        messages.append(message)
+
+    async with mcp_client:
+        result = await mcp_client.call_tool(
+            "search", {"query": "Who is Scrooge's business partner?", "stream": True},
+            progress_handler=on_progress)
+
+        assert len(messages) > 1, "Streamed search should report progress before returning"
+        assert result.data == "".join(messages[1:]), "Streamed chunks should add up to the response"
+
+
+@pytest.mark.asyncio
+async def test_search_tool_global_mode(mcp_client):
+    """
+    Search modes other than the default one can be selected.
+
+    NOTE: THIS IS AN END-TO-END TEST AND REQUIRES THE MCP SERVER TO BE RUNNING LOCALLY.
+    PLEASE START THE MCP SERVER BEFORE RUNNING THIS TEST.
+    """
+    async with mcp_client:
+        result = await mcp_client.call_tool(
+            "search", {"query": "What are the main themes of the story?", "mode": "global"})
+        assert result is not None, "Search tool should return a result for a global query"
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_hits_response_cache(mcp_client):
+    """
+    Repeating a near-identical query is served from the response cache.
+
+    NOTE: THIS IS AN END-TO-END TEST AND REQUIRES THE MCP SERVER TO BE RUNNING LOCALLY.
+    PLEASE START THE MCP SERVER BEFORE RUNNING THIS TEST.
+    """
+    async with mcp_client:
+        first = await mcp_client.call_tool("search", {"query": "Who is Bob Cratchit?", "mode": "local"})
+        before = (await mcp_client.call_tool("cache_stats", {})).data
+        second = await mcp_client.call_tool("search", {"query": "who is bob cratchit", "mode": "local"})
+        after = (await mcp_client.call_tool("cache_stats", {})).data
+
+        assert second.data == first.data, "Near-identical queries should share the cached response"
+        assert after["hits"] == before["hits"] + 1, "The repeated query should be a cache hit"